@@ -13,7 +13,7 @@ package.domain = org.akoslaczko
 source.dir = .
 
 # (list) Source files to include (let empty to include all the files)
-source.include_exts = py,png,jpg,kv,mp3
+source.include_exts = py,png,jpg,kv,mp3,json
 
 # (list) List of inclusions using pattern matching
 #source.include_patterns = assets/*,images/*.png
@@ -22,7 +22,7 @@ source.include_exts = py,png,jpg,kv,mp3
 #source.exclude_exts = spec
 
 # (list) List of directory to exclude (let empty to not exclude anything)
-source.exclude_dirs = tests, bin, venv, venv-v2
+source.exclude_dirs = tests, bin, venv, venv-v2, tools
 
 # (list) List of exclusions using pattern matching
 # Do not prefix with './'
@@ -37,7 +37,7 @@ version = 0.1
 
 # (list) Application requirements
 # comma separated e.g. requirements = sqlite3,kivy
-requirements = python3,asyncgui==0.6.3,asynckivy==0.6.4,certifi==2024.8.30,charset-normalizer==3.3.2,docutils==0.21.2,idna==3.10,Kivy==2.3.0,Kivy-Garden==0.1.5,materialyoucolor==2.0.9,pillow==10.4.0,Pygments==2.18.0,requests==2.32.3,urllib3==2.2.3,git+https://github.com/kivymd/KivyMD.git@master
+requirements = python3,asyncgui==0.6.3,asynckivy==0.6.4,Kivy==2.3.0,materialyoucolor==2.0.9,pillow==10.4.0,git+https://github.com/kivymd/KivyMD.git@master
 
 # (str) Custom source folders for requirements
 # Sets custom source for any requirements with recipes
@@ -51,7 +51,7 @@ icon.filename = %(source.dir)s/assets/icon.png
 
 # (list) Supported orientations
 # Valid options are: landscape, portrait, portrait-reverse or landscape-reverse
-orientation = landscape
+orientation = landscape, portrait, landscape-reverse, portrait-reverse
 
 # (list) List of service to declare
 #services = NAME:ENTRYPOINT_TO_PY,NAME2:ENTRYPOINT2_TO_PY
@@ -167,7 +167,8 @@ android.presplash_color = black
 #android.whitelist_src =
 
 # (str) Path to a custom blacklist file
-#android.blacklist_src =
+# (regenerate with 'python tools/package.py blacklist' after changing imports)
+android.blacklist_src = tools/blacklist.txt
 
 # (list) List of Java .jar files to add to the libs so that pyjnius can access
 # their classes. Don't add jars that you do not need, since extra jars can slow
@@ -2,8 +2,18 @@
 Contains helper functions for various tasks
 """
 
+from collections import namedtuple
 from datetime import timedelta
 import re
+import time
+
+
+# Remaining time under which the player is warned
+WARNING_TIME = timedelta(seconds=10)
+
+# Outcome of charging the active player: the new remaining time and warned state,
+# the event to signal (None, 'warning' or 'flag') and the charged time (in seconds)
+ChargeResult = namedtuple('ChargeResult', ['remaining', 'is_warned', 'event', 'elapsed'])
 
 
 def convert_time_string_to_integer(time_string):
@@ -34,3 +44,107 @@ def convert_timedelta_to_clock_time_string(td):
         else:
             time_string += "0"
     return time_string
+
+def get_window_orientation(window_size):
+    """
+    Helper function returning the orientation ('landscape' or 'portrait') of a window size
+    """
+    width, height = window_size
+    return 'landscape' if width >= height else 'portrait'
+
+def compute_clock_button_size(window_size, orientation, control_size, padding, spacing):
+    """
+    Helper function for computing the size of a clock button from the window size
+    The two clock buttons and the control buttons layout share the window (side by side in landscape,
+    stacked in portrait), so no layout pass is needed to know the size
+    """
+    width, height = window_size
+    control_width, control_height = control_size
+    if orientation == 'landscape':
+        return (
+            (width - 2*padding - 2*spacing - control_width) / 2,
+            height - 2*padding,
+        )
+    return (
+        width - 2*padding,
+        (height - 2*padding - 2*spacing - control_height) / 2,
+    )
+
+def compute_fitted_font_size(button_size, text_ratio, fill):
+    """
+    Helper function for computing the largest font size whose text fits the given part of a button
+    'text_ratio' is the width and height of the text per unit of font size
+    """
+    button_width, button_height = button_size
+    ratio_width, ratio_height = text_ratio
+    return max(1, min(
+        button_width * fill / ratio_width,
+        button_height * fill / ratio_height,
+    ))
+
+def get_monotonic_time():
+    """
+    Helper function returning a monotonic time (in seconds) that keeps counting while the device sleeps
+    time.monotonic (CLOCK_MONOTONIC) stops while a Linux or Android device is suspended, so a game left
+    running with the screen off would not be charged for it. CLOCK_BOOTTIME includes the suspended time,
+    but only exists on Linux, so time.monotonic is used elsewhere
+    """
+    if hasattr(time, 'CLOCK_BOOTTIME'):
+        return time.clock_gettime(time.CLOCK_BOOTTIME)
+    return time.monotonic()
+
+def consume_player_time(remaining, elapsed, is_warned):
+    """
+    Helper function subtracting the elapsed time (in seconds) from a player's remaining time
+    The warning is signalled only when reaching the threshold, the flag when the time runs out
+    """
+    if remaining < timedelta(seconds=elapsed):
+        return ChargeResult(timedelta(0), is_warned, 'flag', elapsed)
+    remaining -= timedelta(seconds=elapsed)
+    if remaining > WARNING_TIME:
+        return ChargeResult(remaining, False, None, elapsed)
+    if not is_warned:
+        return ChargeResult(remaining, True, 'warning', elapsed)
+    return ChargeResult(remaining, True, None, elapsed)
+
+
+class ActivePlayerTimer:
+    """
+    Keeps track of the time stamp up to which the active player was charged
+    Every charge is measured from that stamp on a single time source, so the time spent between two
+    charges (a Clock tick, a handover, or a whole pause in the background) is charged exactly once
+    """
+    def __init__(self, time_source=get_monotonic_time):
+        self.time_source = time_source
+        self.last_stamp = None
+
+    @property
+    def running(self):
+        """
+        Whether the timer is charging the active player
+        """
+        return self.last_stamp is not None
+
+    def start(self):
+        """
+        Start charging from now on
+        """
+        self.last_stamp = self.time_source()
+
+    def stop(self):
+        """
+        Stop charging (the time until the next start is not charged)
+        """
+        self.last_stamp = None
+
+    def charge(self, remaining, is_warned):
+        """
+        Charge the time elapsed since the last charge to a player with the given remaining time
+        The timer stops when the player flags. Nothing is charged while it is stopped
+        """
+        if not self.running:
+            return ChargeResult(remaining, is_warned, None, 0)
+        now = self.time_source()
+        result = consume_player_time(remaining, now - self.last_stamp, is_warned)
+        self.last_stamp = None if result.event == 'flag' else now
+        return result
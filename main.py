@@ -5,25 +5,34 @@ Material Design style chess clock app using KivyMD
 # pylint: disable=E0611 # Disable the error related to importing from pxd files (temporary solution)
 
 from datetime import timedelta
+import gc
+import os
+import time
 
 from kivy.core.audio import SoundLoader
 from kivy.clock import Clock
 from kivy.uix.widget import Widget
+from kivy.uix.recycleboxlayout import RecycleBoxLayout
 from kivy.utils import platform
 from kivy.metrics import dp
 from kivy.core.window import Window
+from kivy.core.text import Label as CoreLabel
 from kivy.logger import Logger
 from kivy.properties import (
     ObjectProperty,
     OptionProperty,
     NumericProperty,
+    StringProperty,
 )
 
+import kivymd.app
 from kivymd.app import MDApp
+from kivymd.theming import ThemeManager
 from kivymd.uix.behaviors import DeclarativeBehavior
 from kivymd.uix.boxlayout import MDBoxLayout
 from kivymd.uix.floatlayout import MDFloatLayout
 from kivymd.uix.scrollview import MDScrollView
+from kivymd.uix.recycleview import MDRecycleView
 from kivymd.uix.button import (
     MDButton,
     MDButtonText,
@@ -47,6 +56,9 @@ from kivymd.uix.textfield import (
     MDTextFieldMaxLengthText,
 )
 import helpers
+import memory
+import presets
+import themes
 
 
 # Window for testing
@@ -58,6 +70,79 @@ if platform not in ['android', 'ios']:
 # ---------------------------------------------------------------------------- #
 
 REFRESH_TIME = 0.01 # in seconds
+FRAME_TIME = 1 / 60 # in seconds
+
+# Available themes as (theme_style, primary_palette) pairs
+THEMES = {
+    "Night": ("Dark", "Green"),
+    "Day": ("Light", "Green"),
+}
+DEFAULT_THEME = "Night"
+
+# Memory
+LEAN_MODE = platform == 'android' # Free dialogs and sounds when they are not needed
+MEMORY_BUDGET = memory.DEFAULT_MEMORY_BUDGET # Resident set size budget in lean mode (in bytes)
+MEMORY_CHECK_INTERVAL = 10 # in seconds
+MEMORY_REPORT = False # Log a per-subsystem memory report on start and when a dialog opens (enables tracemalloc)
+
+# Sounds
+SOUNDS = {
+    'clock_button_click': 'assets/clock-button-press.mp3',
+    'control_button_click': 'assets/control-button-press.mp3',
+    'warning_sound': 'assets/warning-sound.mp3',
+    'flagging_sound': 'assets/flagging-sound.mp3',
+}
+# Sounds only needed while a game is running (freed between games in lean mode)
+GAME_SOUNDS = ['warning_sound', 'flagging_sound']
+# Dialogs of the app (freed when they are not open in lean mode)
+DIALOGS = ['reset_dialog', 'quicksetup_dialog', 'customsetup_dialog']
+
+# Quick setup duration filters as (label, min, max) estimated game durations (in seconds)
+DURATION_FILTERS = [
+    ("Any length", None, None),
+    ("Under 5 min", None, 299),
+    ("5-15 min", 300, 899),
+    ("15-60 min", 900, 3599),
+    ("Over 1 h", 3600, None),
+]
+
+# Layout
+ROOT_PADDING = dp(15)
+ROOT_SPACING = dp(15)
+TIME_TEXT_FILL = 0.85 # Part of the clock button the time text may fill (in both directions)
+TIME_TEXT_SAMPLES = ["0:00:00", "00:00.0"] # Widest clock time strings
+# Arrangements of the root layout for each window orientation
+LAYOUTS = {
+    'landscape': {
+        'root_orientation': "horizontal",
+        'control_positions': {
+            'mcc_play_pause_button': {"center_x": .5, "center_y": .8},
+            'mcc_theme_button': {"center_x": .5, "center_y": .6},
+            'mcc_reset_button': {"center_x": .5, "center_y": .4},
+            'mcc_setup_button': {"center_x": .5, "center_y": .2},
+        },
+    },
+    'portrait': {
+        'root_orientation': "vertical",
+        'control_positions': {
+            'mcc_play_pause_button': {"center_x": .2, "center_y": .5},
+            'mcc_theme_button': {"center_x": .4, "center_y": .5},
+            'mcc_reset_button': {"center_x": .6, "center_y": .5},
+            'mcc_setup_button': {"center_x": .8, "center_y": .5},
+        },
+    },
+}
+
+# ---------------------------------------------------------------------------- #
+#                                    Theming                                   #
+# ---------------------------------------------------------------------------- #
+
+
+class MCCThemeManager(themes.SchemeCacheMixin, ThemeManager):
+    """
+    Theme manager caching the color scheme of each theme (see themes.SchemeCacheMixin)
+    """
+
 
 # ---------------------------------------------------------------------------- #
 #                           Custom classes (main app)                          #
@@ -113,9 +198,9 @@ class MCCTimeText(MDExtendedFabButtonText):
         if not self.disabled:
             # If the clock button is not disabled we also change the text color under 10 sec
             if self.time < timedelta(seconds=10):
-                self.color = self.theme_cls.errorColor
+                self.color = app.theme_colors["errorColor"]
             elif self.time >= timedelta(seconds=10):
-                self.color = self.theme_cls.primaryColor
+                self.color = app.theme_colors["primaryColor"]
 
 
 class MCCControlButtonsLayout(MDFloatLayout):
@@ -135,6 +220,109 @@ class MCCControlButtonsLayout(MDFloatLayout):
         max_child_width = max(child_widths) if len(child_widths) > 0 else 0
         self.width = max_child_width
 
+    def minimize_height(self):
+        """
+        Dynamically adjust height based on max child widget size (used in portrait orientation)
+        """
+        child_heights = [child.height for child in self.children if hasattr(child, 'height')]
+        max_child_height = max(child_heights) if len(child_heights) > 0 else 0
+        self.height = max_child_height
+
+
+class MCCLayoutManager:
+    """
+    Switches the root layout between the precomputed portrait and landscape arrangements
+    The clock button size (and so the fitted time text font size) is computed from the window size
+    directly, so a resize is handled in a single pass without waiting for (or measuring) the layout
+    """
+    def __init__(self, root, time_texts, control_layout):
+        self.root = root
+        self.time_texts = time_texts
+        self.control_layout = control_layout
+        self.orientation = None
+        self.relayout_start = None
+        # Control layout sizes in both orientations (the buttons themselves never change size)
+        self.control_layout.minimize_width()
+        self.control_layout.minimize_height()
+        self.control_size = (self.control_layout.width, self.control_layout.height)
+        # Text extent per unit of font size (measured only once)
+        self.text_ratio = self.measure_text_ratio(time_texts[0].font_name)
+        self.trigger = Clock.create_trigger(lambda dt: self.apply(Window.size))
+
+    @staticmethod
+    def measure_text_ratio(font_name):
+        """
+        Measure the width and height of the widest clock time string per unit of font size
+        """
+        ratio_width, ratio_height = 0, 0
+        for sample in TIME_TEXT_SAMPLES:
+            label = CoreLabel(text=sample, font_size=100, font_name=font_name)
+            label.refresh()
+            ratio_width = max(ratio_width, label.texture.size[0] / 100)
+            ratio_height = max(ratio_height, label.texture.size[1] / 100)
+        return ratio_width, ratio_height
+
+    def get_clock_button_size(self, window_size, orientation):
+        """
+        Compute the size of a clock button for the given window size and orientation
+        """
+        return helpers.compute_clock_button_size(
+            window_size, orientation, self.control_size, ROOT_PADDING, ROOT_SPACING
+        )
+
+    def get_font_size(self, window_size, orientation):
+        """
+        Get the time text font size fitted to the clock buttons
+        (Cheap enough to compute on every resize, so nothing is cached per window size)
+        """
+        button_size = self.get_clock_button_size(window_size, orientation)
+        return helpers.compute_fitted_font_size(button_size, self.text_ratio, TIME_TEXT_FILL)
+
+    def apply(self, window_size):
+        """
+        Apply the arrangement and font size matching the window size in a single pass
+        The re-layout time is measured up to the next frame drawn, as the layout itself runs in that frame
+        """
+        self.relayout_start = time.perf_counter()
+        orientation = helpers.get_window_orientation(window_size)
+        if orientation != self.orientation:
+            layout = LAYOUTS[orientation]
+            self.root.orientation = layout['root_orientation']
+            ids = self.root.get_ids()
+            for button_id, pos_hint in layout['control_positions'].items():
+                getattr(ids, button_id).pos_hint = pos_hint
+            if orientation == 'landscape':
+                self.control_layout.size_hint = (None, 1)
+                self.control_layout.width = self.control_size[0]
+            else:
+                self.control_layout.size_hint = (1, None)
+                self.control_layout.height = self.control_size[1]
+            self.orientation = orientation
+        font_size = self.get_font_size(window_size, orientation)
+        for time_text in self.time_texts:
+            time_text.font_size = font_size
+        Window.unbind(on_flip=self.on_relayout_drawn)
+        Window.bind(on_flip=self.on_relayout_drawn)
+
+    def on_relayout_drawn(self, *args):
+        """
+        Bound method (for one frame) logging the re-layout time
+        """
+        Window.unbind(on_flip=self.on_relayout_drawn)
+        elapsed = time.perf_counter() - self.relayout_start
+        Logger.debug(
+            "MCCApp: Re-layout for %s window %s took %.2f ms",
+            self.orientation,
+            Window.size,
+            elapsed * 1000,
+        )
+
+    def on_window_size(self, *args):
+        """
+        Bound method for the window size (several resize events within a frame are handled once)
+        """
+        self.trigger()
+
 
 # ---------------------------------------------------------------------------- #
 #                                 Reset dialog                                 #
@@ -199,141 +387,205 @@ class MCCQuickSetupDialog(MDDialog):
         )
         self.add_widget(self.title)
         # ---------------------------------- Options --------------------------------- #
+        self.favourites_path = os.path.join(app.user_data_dir, 'favourites.json')
+        self.catalog = presets.get_catalog(self.favourites_path)
+        self.category = None
+        self.duration_filter = DURATION_FILTERS[0]
+        self.category_layout = MCCQuickSetupCategoryLayout(
+            adaptive_height=True,
+            spacing="8dp",
+            id="mcc_quicksetup_dialog_category_layout",
+        )
+        self.duration_layout = MCCQuickSetupCategoryLayout(
+            adaptive_height=True,
+            spacing="8dp",
+            id="mcc_quicksetup_dialog_duration_layout",
+        )
+        self.recycleview = MCCQuickSetupRecycleView(
+            size_hint_y=None,
+            height=dp(120),
+            id="mcc_quicksetup_dialog_content_recycleview",
+        )
         self.options = MDDialogContentContainer(
-            MCCQuickSetupScrollView(
-                MCCQuickSetupLayout(
-                    height=dp(120),
-                    adaptive_width=True,
-                    spacing="10dp",
-                    padding="10dp",
-                    id="mcc_quicksetup_dialog_content_layout",
-                ),
-                size_hint_y=None,
-                height=dp(120),
-                id="mcc_quicksetup_dialog_content_scrollview",
-            ),
+            self.category_layout,
+            self.duration_layout,
+            self.recycleview,
+            orientation="vertical",
             id="mcc_quicksetup_dialog_content",
         )
         self.add_widget(self.options)
+        # Category filter buttons (and the favourite toggle of the current time control)
+        self.add_category_buttons()
+        # Duration filter buttons
+        for duration_filter in DURATION_FILTERS:
+            self.duration_layout.add_widget(
+                MDButton(
+                    MDButtonText(text=duration_filter[0]),
+                    style="text",
+                    on_release=lambda *args, duration_filter=duration_filter: self.show_duration(duration_filter),
+                )
+            )
+        self.show_presets()
+
+    def add_category_buttons(self):
+        """
+        Method for (re)creating the category filter buttons and the favourite toggle
+        """
+        self.category_layout.clear_widgets()
+        for category in [None] + self.catalog.categories():
+            self.category_layout.add_widget(
+                MDButton(
+                    MDButtonText(text=category or "All"),
+                    style="text",
+                    on_release=lambda *args, category=category: self.show_category(category),
+                )
+            )
+        starting_time, increment = self.get_current_time_control()
+        is_favourite = presets.is_favourite(self.favourites_path, starting_time, increment)
+        self.category_layout.add_widget(
+            MDButton(
+                MDButtonText(text="Unfavourite current" if is_favourite else "Favourite current"),
+                style="outlined",
+                on_release=self.on_release_favourite_button,
+            )
+        )
+
+    @staticmethod
+    def get_current_time_control():
+        """
+        Returns the app's current time control as (starting time in minutes, increment in seconds)
+        """
+        starting_time = app.starting_time.total_seconds() / 60
+        increment = app.increment.total_seconds()
+        return (
+            int(starting_time) if starting_time.is_integer() else starting_time,
+            int(increment) if increment.is_integer() else increment,
+        )
 
+    def on_release_favourite_button(self, *args):
+        """
+        On release method for the favourite toggle: adds (or removes) the current time control
+        """
+        starting_time, increment = self.get_current_time_control()
+        added = presets.toggle_favourite(self.favourites_path, starting_time, increment)
+        Logger.info(
+            "MCCApp: %s favourite %s + %s",
+            "Added" if added else "Removed",
+            starting_time,
+            increment,
+        )
+        self.catalog = presets.get_catalog(self.favourites_path)
+        if self.category == presets.FAVOURITES_CATEGORY and not self.catalog.favourites:
+            self.category = None
+        self.add_category_buttons()
+        self.show_presets()
+
+    def show_category(self, category):
+        """
+        Method for showing the time-control options of the given category (or all of them)
+        """
+        self.category = category
+        self.show_presets()
 
-class MCCQuickSetupScrollView(MDScrollView):
+    def show_duration(self, duration_filter):
+        """
+        Method for showing the time-control options within the given estimated game duration
+        """
+        self.duration_filter = duration_filter
+        self.show_presets()
+
+    def show_presets(self):
+        """
+        Method for showing the time-control options matching the selected category and duration
+        """
+        label, min_duration, max_duration = self.duration_filter
+        self.recycleview.set_presets(self.catalog.filter(self.category, min_duration, max_duration))
+        Logger.info(
+            "MCCApp: Showing quick setup options for category=%s, duration=%s",
+            self.category,
+            label,
+        )
+
+
+class MCCQuickSetupCategoryLayout(MDBoxLayout):
     """
-    The scroll view containing the MCCQuickSetupLayout instance
+    Container for the category and duration filter buttons of the Quick Setup dialog
     """
-    def __init__(self, *args, **kwargs):
-        super().__init__(*args, **kwargs)
-        # self.height = max([child.height for child in self.children])
-        Logger.info("MCCApp: MCCQuickSetupScrollView height=%s", self.height)
 
 
-class MCCQuickSetupLayout(MDBoxLayout):
+class MCCQuickSetupRecycleView(MDRecycleView):
     """
-    Container for various quick setup options
+    Recycle view for the quick setup options
+    Only the visible options get a widget, so the cost of opening the dialog does not depend
+    on the size of the catalog
     """
-
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
-        self.timecontrol_options = [
-            {
-                'type': 'Bullet',
-                'starting_time': 1,
-                'increment': 0,
-            },
-            {
-                'type': 'Bullet',
-                'starting_time': 2,
-                'increment': 1,
-            },
-            {
-                'type': 'Blitz',
-                'starting_time': 3,
-                'increment': 0,
-            },
-            {
-                'type': 'Blitz',
-                'starting_time': 3,
-                'increment': 2,
-            },
-            {
-                'type': 'Blitz',
-                'starting_time': 5,
-                'increment': 0,
-            },
-            {
-                'type': 'Blitz',
-                'starting_time': 5,
-                'increment': 3,
-            },
-            {
-                'type': 'Rapid',
-                'starting_time': 10,
-                'increment': 0,
-            },
-            {
-                'type': 'Rapid',
-                'starting_time': 10,
-                'increment': 5,
-            },
-            {
-                'type': 'Rapid',
-                'starting_time': 15,
-                'increment': 10,
-            },
-            {
-                'type': 'Classical',
-                'starting_time': 30,
-                'increment': 0,
-            },
-            {
-                'type': 'Classical',
-                'starting_time': 30,
-                'increment': 20,
-            },
-        ]
-        self.add_timecontrol_options()
-        # self.height = max([child.height for child in self.children]) + dp(20)
-        Logger.info("MCCApp: MCCQuickSetupLayout height=%s", self.height)
+        self.viewclass = MCCQuickSetupButton
+        self.do_scroll_y = False
+        layout = RecycleBoxLayout(
+            orientation="horizontal",
+            default_size=(dp(100), dp(100)),
+            default_size_hint=(None, None),
+            size_hint=(None, None),
+            height=dp(120),
+            spacing=dp(10),
+            padding=dp(10),
+        )
+        layout.bind(minimum_width=layout.setter('width'))
+        self.add_widget(layout)
 
-    def add_timecontrol_options(self):
+    def set_presets(self, timecontrol_presets):
         """
-        Method for adding button widgets that represent the different timecontrol options
+        Method for replacing the displayed time-control options
         """
-        for i, option in enumerate(self.timecontrol_options):
-            timecontrol_button = MCCQuickSetupButton(
-                MDButtonText(
-                    # text=str(option["starting_time"]) + " + " + str(option["increment"]) + "\n" + option["type"],
-                    text=str(option["starting_time"]) + " + " + str(option["increment"]),
-                    pos_hint={'center_x': 0.5,'center_y': 0.5},
-                    font_style="Title"
-                ),
-                style="outlined",
-                theme_width="Custom",
-                theme_height="Custom",
-                height=dp(100),
-                width=dp(100),
-                size_hint=(None, None),
-                # Setting the actual time-control variables
-                starting_time = option["starting_time"],
-                increment = option["increment"],
-                # ID
-                id="quicksetup_button_" + str(i),
-            )
-            self.add_widget(timecontrol_button)
+        self.data = [
+            {
+                'text': str(preset.starting_time) + " + " + str(preset.increment),
+                'starting_time': preset.starting_time,
+                'increment': preset.increment,
+            }
+            for preset in timecontrol_presets
+        ]
+        self.scroll_x = 0
 
 
 class MCCQuickSetupButton(MDButton):
     """
     Class for buttons that represent the Quick Setup options
+    Used as the view class of MCCQuickSetupRecycleView, so instances get reused for different options
     """
+    text = StringProperty()
     starting_time = NumericProperty()
     increment = NumericProperty()
 
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        # Setting existing visual attributes
+        self.style = "outlined"
+        self.theme_width = "Custom"
+        self.theme_height = "Custom"
+        self.size_hint = (None, None)
+        self.height = dp(100)
+        self.width = dp(100)
+        # Text of the option
+        self.button_text = MDButtonText(
+            text=self.text,
+            pos_hint={'center_x': 0.5,'center_y': 0.5},
+            font_style="Title",
+        )
+        self.add_widget(self.button_text)
+        self.bind(text=self.button_text.setter('text'))
+
     def on_release(self, *args):
         """
         On press method for setup dialog accept button
         """
-        Logger.info("MCCApp: Pressed quick setup dialog option with 'id': %s", self.id)
+        Logger.info(
+            "MCCApp: Pressed quick setup dialog option: %s + %s",
+            self.starting_time,
+            self.increment,
+        )
         # Updating default variables
         app.starting_time = timedelta(minutes=self.starting_time)
         app.increment = timedelta(seconds=self.increment)
@@ -453,30 +705,56 @@ class MCCApp(MDApp):
     increment = ObjectProperty(timedelta(seconds=5))
 
     def __init__(self, *args, **kwargs):
-        super().__init__(*args, **kwargs)
+        # MDApp creates its theme manager in its constructor: have it create ours instead of
+        # replacing it afterwards (the replaced one would stay alive through its bindings)
+        theme_manager_class = kivymd.app.ThemeManager
+        kivymd.app.ThemeManager = MCCThemeManager
+        try:
+            super().__init__(*args, **kwargs)
+        finally:
+            kivymd.app.ThemeManager = theme_manager_class
+        if not isinstance(self.theme_cls, MCCThemeManager):
+            self.theme_cls = MCCThemeManager()
         # State attributes
         self.running = False
         self.flagged = False
         # Scheduler
         self.refresh_event = None
-        # Sounds
-        self.clock_button_click = SoundLoader.load('assets/clock-button-press.mp3')
-        self.control_button_click = SoundLoader.load('assets/control-button-press.mp3')
-        self.warning_sound = SoundLoader.load('assets/warning-sound.mp3')
-        self.flagging_sound = SoundLoader.load('assets/flagging-sound.mp3')
+        self.timer = helpers.ActivePlayerTimer() # Charges the active player (also for the time spent paused)
+        # Memory
+        self.memory_tracker = memory.MemoryTracker(enabled=MEMORY_REPORT)
+        self.memory_check_event = None
+        # Sounds (loaded on demand in lean mode)
+        self.sounds = {}
+        if not LEAN_MODE:
+            self.load_sounds(SOUNDS)
         # Dialogs
         self.reset_dialog = None
         self.customsetup_dialog = None
         self.quicksetup_dialog = None
+        # Layout
+        self.layout_manager = None
+        # Theming
+        self.theme_name = DEFAULT_THEME
+        self.theme_colors = {}
+        self.theme_switch_start = None
 
     def build(self):
-        # Theming
-        self.theme_cls.theme_style = "Dark"
-        self.theme_cls.primary_palette = "Green"
+        # Theming (only the starting theme is computed here, the others on first use)
+        self.theme_cls.set_theme(*THEMES[self.theme_name])
+        self.theme_colors = self.theme_cls.get_scheme()
         # ---------------------------------------------------------------------------- #
         #                           Root widget for the app                            #
         # ---------------------------------------------------------------------------- #
-        self.root = MCCRootLayout(
+        with self.memory_tracker.track('clock_faces'):
+            self.root = self.build_root()
+        return self.root
+
+    def build_root(self):
+        """
+        Build the root widget tree of the app
+        """
+        return MCCRootLayout(
             # -------------------------- Clock button for White -------------------------- #
             MCCClockButton(
                 MCCTimeText(
@@ -493,19 +771,31 @@ class MCCApp(MDApp):
                     MDExtendedFabButtonIcon(
                         icon="play-pause"
                     ),
-                    pos_hint={"center_x": .5, "center_y": .75},
+                    pos_hint={"center_x": .5, "center_y": .8},
                     theme_elevation_level="Custom",
                     elevation_level=3,
                     disabled=False,
                     on_press=self.on_press_playpause_button,
                     id="mcc_play_pause_button",
                 ),
+                # ------------------------------- Theme button ------------------------------- #
+                MDExtendedFabButton(
+                    MDExtendedFabButtonIcon(
+                        icon="theme-light-dark"
+                    ),
+                    pos_hint={"center_x": .5, "center_y": .6},
+                    theme_elevation_level="Custom",
+                    elevation_level=3,
+                    disabled=False,
+                    on_press=self.on_press_theme_button,
+                    id="mcc_theme_button",
+                ),
                 # ------------------------------- Reset button ------------------------------- #
                 MDExtendedFabButton(
                     MDExtendedFabButtonIcon(
                         icon="refresh"
                     ),
-                    pos_hint={"center_x": .5, "center_y": .5},
+                    pos_hint={"center_x": .5, "center_y": .4},
                     theme_elevation_level="Custom",
                     elevation_level=3,
                     disabled=False,
@@ -517,7 +807,7 @@ class MCCApp(MDApp):
                     MDExtendedFabButtonIcon(
                         icon="cog"
                     ),
-                    pos_hint={"center_x": .5, "center_y": .25},
+                    pos_hint={"center_x": .5, "center_y": .2},
                     theme_elevation_level="Custom",
                     elevation_level=3,
                     disabled=False,
@@ -537,12 +827,40 @@ class MCCApp(MDApp):
                 on_press=self.on_press_clock_button,
                 id="mcc_clock_button_black",
             ),
-            md_bg_color=self.theme_cls.primaryContainerColor,
-            padding="15dp",
-            spacing="15dp",
+            md_bg_color=self.theme_colors["primaryContainerColor"],
+            padding=ROOT_PADDING,
+            spacing=ROOT_SPACING,
             id="mcc_root_layout",
         )
-        return self.root
+
+    def switch_theme(self, theme_name=None):
+        """
+        Switch to the given theme (or to the next one) and apply its colors in a single pass
+        The cost is measured up to the next frame drawn, so it includes the widget updates and the redraw
+        """
+        if theme_name is None:
+            theme_names = list(THEMES)
+            theme_name = theme_names[(theme_names.index(self.theme_name) + 1) % len(theme_names)]
+        self.theme_switch_start = time.perf_counter()
+        self.theme_name = theme_name
+        # KivyMD widgets (including the pre-built dialogs) follow the theme manager on their own
+        self.theme_cls.set_theme(*THEMES[theme_name])
+        self.theme_colors = self.theme_cls.get_scheme()
+        # Our own widgets
+        self.root.md_bg_color = self.theme_colors["primaryContainerColor"]
+        for side in [self.get_white_side(), self.get_black_side()]:
+            side['time_text'].on_change_time()
+        Window.bind(on_flip=self.on_theme_switch_drawn)
+
+    def on_theme_switch_drawn(self, *args):
+        """
+        Bound method (for one frame) logging the cost of the last theme switch
+        """
+        Window.unbind(on_flip=self.on_theme_switch_drawn)
+        elapsed = time.perf_counter() - self.theme_switch_start
+        Logger.info("MCCApp: Switched to theme '%s' in %.2f ms", self.theme_name, elapsed * 1000)
+        if elapsed > FRAME_TIME:
+            Logger.warning("MCCApp: Theme switch took longer than a frame (%.2f ms)", elapsed * 1000)
 
     def get_white_side(self):
         """
@@ -562,37 +880,153 @@ class MCCApp(MDApp):
             'time_text': self.root.get_ids().mcc_time_text_black,
         }
 
+    def on_start(self):
+        # Layout
+        ids = self.root.get_ids()
+        self.layout_manager = MCCLayoutManager(
+            self.root,
+            [ids.mcc_time_text_white, ids.mcc_time_text_black],
+            ids.mcc_control_buttons_layout,
+        )
+        self.layout_manager.apply(Window.size)
+        Window.bind(size=self.layout_manager.on_window_size)
+        if LEAN_MODE:
+            self.memory_check_event = Clock.schedule_interval(
+                self.check_memory_budget, MEMORY_CHECK_INTERVAL
+            )
+        if MEMORY_REPORT:
+            self.log_memory_report()
+
+    def load_sounds(self, names):
+        """
+        Load the given sounds (if they are not loaded yet)
+        """
+        with self.memory_tracker.track('sounds'):
+            for name in names:
+                if name not in self.sounds:
+                    self.sounds[name] = SoundLoader.load(SOUNDS[name])
+
+    def unload_sounds(self, names):
+        """
+        Unload the given sounds and free their audio buffers
+        """
+        memory.unload_sounds(self.sounds, names)
+        if not self.sounds:
+            self.memory_tracker.release('sounds')
+
+    def play_sound(self, name):
+        """
+        Play the given sound (loading it first if necessary)
+        """
+        self.load_sounds([name])
+        if self.sounds[name]:
+            self.sounds[name].play()
+
+    def release_memory(self):
+        """
+        Free the dialogs that are not open and the sounds that are not needed at the moment
+        """
+        if not memory.release_closed_dialogs(self, DIALOGS):
+            self.memory_tracker.release('dialogs')
+        if not self.running:
+            self.unload_sounds(GAME_SOUNDS)
+        # Dismissed dialog trees are full of reference cycles, so collect them right away
+        gc.collect()
+
+    def check_memory_budget(self, *args):
+        """
+        Release memory if the resident set size is over the budget
+        (Skipped where the current resident set size is not available)
+        """
+        resident = memory.resident_set_size()
+        if resident is not None and resident > MEMORY_BUDGET:
+            self.release_memory()
+            resident = memory.resident_set_size()
+            if resident is None:
+                return None
+            Logger.info("MCCApp: Released memory, resident set size=%.1f MB", resident / 2**20)
+            if resident > MEMORY_BUDGET:
+                Logger.warning(
+                    "MCCApp: Resident set size (%.1f MB) is over the budget (%.1f MB)",
+                    resident / 2**20,
+                    MEMORY_BUDGET / 2**20,
+                )
+        return resident
+
+    def get_memory_report(self):
+        """
+        Get the memory report of the app broken down by subsystem
+        """
+        dialogs = [self.reset_dialog, self.quicksetup_dialog, self.customsetup_dialog]
+        clock_buttons = [self.get_white_side()['button'], self.get_black_side()['button']]
+        # Text textures are counted under 'fonts' only, shadows and the like under their widgets
+        subsystem_textures = {'fonts': {}, 'clock_faces': {}, 'dialogs': {}}
+        for widget in [self.root] + [dialog for dialog in dialogs if dialog]:
+            subsystem_textures['fonts'].update(memory.widget_textures(widget, text=True))
+        for button in clock_buttons:
+            subsystem_textures['clock_faces'].update(memory.widget_textures(button, text=False))
+        for dialog in dialogs:
+            if dialog:
+                subsystem_textures['dialogs'].update(memory.widget_textures(dialog, text=False))
+        return self.memory_tracker.report(
+            textures=memory.texture_bytes(subsystem_textures),
+            native={
+                'sounds': sum(
+                    memory.sound_bytes(sound, SOUNDS[name]) for name, sound in self.sounds.items() if sound
+                ),
+            },
+        )
+
+    def log_memory_report(self, *args):
+        """
+        Log the memory report of the app (can be called at any time, eg from a Clock event)
+        """
+        for subsystem, usage in self.get_memory_report().items():
+            Logger.info(
+                "MCCApp: Memory [%s] %s",
+                subsystem,
+                ", ".join(
+                    f"{kind}={size / 2**20:.2f} MB" if size is not None else f"{kind}=n/a"
+                    for kind, size in usage.items()
+                ),
+            )
+
     def refresh_active_players_time(self, dt):
         """
         Refresh active player time
+        (Kivy's 'dt' is not used: the elapsed time comes from the timer, like after a pause)
+        """
+        self.charge_active_player()
+
+    def charge_active_player(self):
+        """
+        Charge the active player with the time elapsed since the last charge, warning and flagging if necessary
+        Returns the charged time (in seconds)
         """
         # Get the active player's widgets
         if self.active_player == 'white':
             active_side = self.get_white_side()
         elif self.active_player == 'black':
             active_side = self.get_black_side()
-        # Refresh player time
-        if active_side['time_text'].time >= timedelta(seconds=dt):
-            active_side['time_text'].time -= timedelta(seconds=dt)
-            # Play warning sound if under critical time (but only when reaching the threshold)
-            if active_side['time_text'].time <= timedelta(seconds=10):
-                if not active_side['time_text'].is_warned:
-                    self.warning_sound.play()
-                    active_side['time_text'].is_warned = True
-            else:
-                active_side['time_text'].is_warned = False
-        else:
-            # Flagging
-            active_side['time_text'].time = timedelta(milliseconds=0)
+        time_text = active_side['time_text']
+        result = self.timer.charge(time_text.time, time_text.is_warned)
+        time_text.time = result.remaining
+        time_text.is_warned = result.is_warned
+        if result.event == 'warning':
+            self.play_sound('warning_sound')
+        elif result.event == 'flag':
             self.stop_clock()
             self.flagged = True
-            self.flagging_sound.play()
+            self.play_sound('flagging_sound')
+        return result.elapsed
 
     def start_clock(self):
         """
         Start clock
         """
         self.running = True
+        self.load_sounds(GAME_SOUNDS)
+        self.timer.start()
         if not self.refresh_event:
             self.refresh_event = Clock.schedule_interval(self.refresh_active_players_time, REFRESH_TIME)
         self.update_control_buttons_disabled_state()
@@ -603,6 +1037,7 @@ class MCCApp(MDApp):
         Stop clock
         """
         self.running = False
+        self.timer.stop()
         if self.refresh_event:
             Clock.unschedule(self.refresh_event)
             self.refresh_event = None
@@ -615,9 +1050,11 @@ class MCCApp(MDApp):
         if self.running:
             self.root.get_ids().mcc_reset_button.disabled = True
             self.root.get_ids().mcc_setup_button.disabled = True
+            self.root.get_ids().mcc_theme_button.disabled = True
         elif not self.running:
             self.root.get_ids().mcc_reset_button.disabled = False
             self.root.get_ids().mcc_setup_button.disabled = False
+            self.root.get_ids().mcc_theme_button.disabled = False
 
     def reset_clock(self):
         """
@@ -631,13 +1068,18 @@ class MCCApp(MDApp):
         self.get_black_side()['button'].disabled = True
         self.get_white_side()['time_text'].time = self.starting_time
         self.get_black_side()['time_text'].time = self.starting_time
+        if LEAN_MODE:
+            self.release_memory()
 
     def on_press_clock_button(self, *args):
         """
         On press method for clock buttons
         """
+        # Charge the time up to the handover (it may also flag the player)
+        if self.running:
+            self.charge_active_player()
         if not self.flagged:
-            self.clock_button_click.play()
+            self.play_sound('clock_button_click')
             if len(args) > 0 and isinstance(args[0], MCCClockButton):
                 button = args[0]
                 if button == self.get_white_side()['button']:
@@ -659,7 +1101,7 @@ class MCCApp(MDApp):
         On press method for Play/Pause button
         """
         if not self.flagged:
-            self.control_button_click.play()
+            self.play_sound('control_button_click')
             if self.running:
                 self.stop_clock()
             elif not self.running:
@@ -670,24 +1112,38 @@ class MCCApp(MDApp):
         """
         On press method for Reset button
         """
-        self.control_button_click.play()
+        self.play_sound('control_button_click')
         # Initialize dialog
         if not self.reset_dialog:
-            self.reset_dialog = MCCResetDialog()
+            with self.memory_tracker.track('dialogs'):
+                self.reset_dialog = MCCResetDialog()
         self.reset_dialog.open()
+        if MEMORY_REPORT:
+            Clock.schedule_once(self.log_memory_report)
         Logger.info("MCCApp: Pressed reset button")
 
     def on_press_setup_button(self, *args):
         """
         On press method for Setup button
         """
-        self.control_button_click.play()
+        self.play_sound('control_button_click')
         # Initialize dialog
         if not self.quicksetup_dialog:
-            self.quicksetup_dialog = MCCQuickSetupDialog()
+            with self.memory_tracker.track('dialogs'):
+                self.quicksetup_dialog = MCCQuickSetupDialog()
         self.quicksetup_dialog.open()
+        if MEMORY_REPORT:
+            Clock.schedule_once(self.log_memory_report)
         Logger.info("MCCApp: Pressed setup button")
 
+    def on_press_theme_button(self, *args):
+        """
+        On press method for Theme button
+        """
+        self.play_sound('control_button_click')
+        self.switch_theme()
+        Logger.info("MCCApp: Pressed theme button")
+
     def on_press_reset_dialog_cancel(self, *args):
         """
         On press method for reset dialog cancel button
@@ -729,8 +1185,41 @@ class MCCApp(MDApp):
         self.reset_clock()
         self.setup_dialog.dismiss()
 
+    def on_pause(self):
+        """
+        Drop every scheduled event while the app is in the background
+        Only the time stamp of the last charge is kept, the rest is charged on resume
+        """
+        if self.refresh_event:
+            Clock.unschedule(self.refresh_event)
+            self.refresh_event = None
+        if self.memory_check_event:
+            Clock.unschedule(self.memory_check_event)
+            self.memory_check_event = None
+        Logger.info("MCCApp: Paused (running=%s)", self.running)
+        return True
+
+    def on_resume(self):
+        """
+        Charge the time spent in the background to the active player and restart the scheduled events
+        """
+        elapsed = 0
+        if self.running and not self.flagged:
+            # Flags that fell during the pause are processed here (in a single update of the time)
+            elapsed = self.charge_active_player()
+            if self.running and not self.refresh_event:
+                self.refresh_event = Clock.schedule_interval(self.refresh_active_players_time, REFRESH_TIME)
+        if LEAN_MODE and not self.memory_check_event:
+            self.memory_check_event = Clock.schedule_interval(
+                self.check_memory_budget, MEMORY_CHECK_INTERVAL
+            )
+        Logger.info("MCCApp: Resumed, charged %.2f seconds (running=%s)", elapsed, self.running)
+
     def on_stop(self):
         self.stop_clock()
+        if self.memory_check_event:
+            Clock.unschedule(self.memory_check_event)
+            self.memory_check_event = None
 
 # ---------------------------------------------------------------------------- #
 #                                   Start app                                  #
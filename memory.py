@@ -0,0 +1,191 @@
+"""
+Contains helpers for measuring the memory footprint of the app
+"""
+
+from contextlib import contextmanager
+import mmap
+import os
+import sys
+import tracemalloc
+
+try:
+    import resource
+except ImportError: # Not available on Windows
+    resource = None
+
+
+# Default resident set size budget of the lean mode (in bytes)
+DEFAULT_MEMORY_BUDGET = 200 * 1024 * 1024
+
+# Decoded audio format assumed for estimating sound buffer sizes (16 bit stereo)
+AUDIO_SAMPLE_RATE = 44100
+AUDIO_CHANNELS = 2
+AUDIO_SAMPLE_WIDTH = 2
+
+
+def resident_set_size():
+    """
+    Helper function returning the current resident set size of the process (in bytes)
+    Returns None where it is not available (only the peak is, which never goes down)
+    """
+    try:
+        with open('/proc/self/statm', encoding='utf-8') as file:
+            resident_pages = int(file.read().split()[1])
+        return resident_pages * mmap.PAGESIZE
+    except (OSError, IndexError, ValueError):
+        return None
+
+
+def peak_resident_set_size():
+    """
+    Helper function returning the peak resident set size of the process (in bytes)
+    Returns None where it is not available
+    """
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # 'ru_maxrss' is in bytes on macOS, in kilobytes elsewhere
+    return peak if sys.platform == 'darwin' else peak * 1024
+
+
+def sound_bytes(sound, path=None):
+    """
+    Helper function estimating the native memory (in bytes) of a loaded sound
+    Uses the decoded size if the length is known, the file size otherwise
+    """
+    length = getattr(sound, 'length', 0) or 0
+    if length > 0:
+        return int(length * AUDIO_SAMPLE_RATE * AUDIO_CHANNELS * AUDIO_SAMPLE_WIDTH)
+    if path and os.path.exists(path):
+        return os.path.getsize(path)
+    return 0
+
+
+def release_closed_dialogs(owner, names):
+    """
+    Helper function dropping the dialogs (attributes of 'owner') that are not open
+    A dialog is open while it is attached to the window. Returns whether any dialog was kept
+    """
+    kept = False
+    for name in names:
+        dialog = getattr(owner, name)
+        if dialog and not dialog.parent:
+            setattr(owner, name, None)
+        elif dialog:
+            kept = True
+    return kept
+
+
+def unload_sounds(sounds, names):
+    """
+    Helper function unloading the given sounds (from a dict of name -> sound) and freeing their buffers
+    """
+    for name in names:
+        sound = sounds.pop(name, None)
+        if sound:
+            sound.stop()
+            sound.unload()
+
+
+def _instruction_textures(instruction):
+    """
+    Helper generator yielding the textures of a canvas instruction (and its children)
+    """
+    texture = getattr(instruction, 'texture', None)
+    if texture is not None:
+        yield texture
+    for child in getattr(instruction, 'children', None) or []:
+        yield from _instruction_textures(child)
+
+
+def widget_textures(widget, text=None):
+    """
+    Helper function returning the textures used by a widget tree (as a dict of id -> texture)
+    With 'text=True' only the rendered text (font) textures, with 'text=False' only the others
+    """
+    textures = {}
+    for child in widget.walk(restrict=True):
+        text_texture = getattr(child, 'texture', None) if hasattr(child, 'font_size') else None
+        candidates = []
+        if text is not False:
+            candidates.append(text_texture)
+        if text is not True:
+            for canvas in [child.canvas.before, child.canvas, child.canvas.after]:
+                candidates.extend(
+                    texture for texture in _instruction_textures(canvas) if texture is not text_texture
+                )
+        for texture in candidates:
+            if texture is not None:
+                textures[id(texture)] = texture
+    return textures
+
+
+def texture_bytes(subsystem_textures):
+    """
+    Helper function estimating the GPU memory (in bytes, as RGBA) of the textures of each subsystem
+    A texture shared by several subsystems is only counted for the first one
+    """
+    counted = set()
+    sizes = {}
+    for subsystem, textures in subsystem_textures.items():
+        sizes[subsystem] = 0
+        for texture_id, texture in textures.items():
+            if texture_id not in counted:
+                counted.add(texture_id)
+                sizes[subsystem] += texture.width * texture.height * 4
+    return sizes
+
+
+class MemoryTracker:
+    """
+    Tracks Python allocations (with tracemalloc) per subsystem of the app
+    """
+    def __init__(self, enabled=False):
+        self.enabled = enabled
+        self.allocations = {}
+        if self.enabled and not tracemalloc.is_tracing():
+            tracemalloc.start()
+
+    @contextmanager
+    def track(self, subsystem):
+        """
+        Context manager attributing the memory allocated inside it to the given subsystem
+        """
+        if not self.enabled:
+            yield
+            return
+        before = tracemalloc.get_traced_memory()[0]
+        try:
+            yield
+        finally:
+            allocated = tracemalloc.get_traced_memory()[0] - before
+            self.allocations[subsystem] = self.allocations.get(subsystem, 0) + allocated
+
+    def release(self, subsystem):
+        """
+        Forget the allocations of a subsystem (eg after its objects were freed)
+        """
+        self.allocations.pop(subsystem, None)
+
+    def report(self, textures=None, native=None):
+        """
+        Returns the memory report as a dict of subsystem -> {'python': bytes, 'textures': bytes, 'native': bytes}
+        'textures' and 'native' (eg decoded audio) are measured by the caller, as they are not seen by tracemalloc
+        """
+        textures = textures or {}
+        native = native or {}
+        report = {}
+        for subsystem in sorted(set(self.allocations) | set(textures) | set(native)):
+            report[subsystem] = {
+                'python': self.allocations.get(subsystem, 0),
+                'textures': textures.get(subsystem, 0),
+                'native': native.get(subsystem, 0),
+            }
+        report['total'] = {
+            'python': tracemalloc.get_traced_memory()[0] if self.enabled else 0,
+            'textures': sum(textures.values()),
+            'native': sum(native.values()),
+            'resident': resident_set_size(),
+            'peak_resident': peak_resident_set_size(),
+        }
+        return report
@@ -0,0 +1,209 @@
+"""
+Contains the time-control preset catalog used by the Quick Setup dialog
+"""
+
+from bisect import bisect_left, bisect_right
+from collections import namedtuple
+import json
+import logging
+import os
+
+# Kivy's logger (when the app runs, a plain logger otherwise)
+Logger = logging.getLogger('kivy')
+
+
+PRESETS_PATH = 'assets/presets.json'
+FAVOURITES_CATEGORY = 'Favourites'
+CATEGORIES = ('Bullet', 'Blitz', 'Rapid', 'Classical')
+
+# Compact, immutable record for a single time-control preset
+# ('starting_time' is in minutes, 'increment' in seconds, like in the app)
+# Every time control appears once, 'sources' lists who uses it (eg FIDE, USCF, Online)
+TimeControlPreset = namedtuple(
+    'TimeControlPreset',
+    ['type', 'starting_time', 'increment', 'sources', 'duration'],
+)
+
+
+def estimate_game_duration(starting_time, increment):
+    """
+    Helper function for estimating the duration of a game (per player, in seconds)
+    Uses the common 'starting time + 40 moves worth of increment' rule
+    """
+    return starting_time*60 + 40*increment
+
+
+def classify_time_control(starting_time, increment):
+    """
+    Helper function returning the category of a time control
+    Uses the FIDE rule of the time for 60 moves ('starting time + 60 times the increment', in minutes)
+    """
+    time_for_60_moves = starting_time + increment
+    if time_for_60_moves <= 3 and starting_time < 3:
+        return 'Bullet'
+    if time_for_60_moves < 10:
+        return 'Blitz'
+    if time_for_60_moves < 60:
+        return 'Rapid'
+    return 'Classical'
+
+
+def _read_presets(path, sources=None):
+    """
+    Helper function for reading presets from a JSON file
+    """
+    with open(path, encoding='utf-8') as file:
+        content = json.load(file)
+    presets = []
+    for option in content.get('presets', []):
+        presets.append(TimeControlPreset(
+            type=option['type'],
+            starting_time=option['starting_time'],
+            increment=option['increment'],
+            sources=tuple(sources or option.get('sources', [])),
+            duration=estimate_game_duration(option['starting_time'], option['increment']),
+        ))
+    return presets
+
+
+class TimeControlCatalog:
+    """
+    Indexed collection of time-control presets
+    Presets are kept sorted by estimated duration, and every category has its own index list,
+    so filtering does not need to scan (or copy) the whole catalog
+    """
+    def __init__(self, presets, favourites=()):
+        self.presets = tuple(sorted(presets, key=lambda preset: preset.duration))
+        self.favourites = tuple(favourites)
+        self.durations = tuple(preset.duration for preset in self.presets)
+        self.index = {}
+        for i, preset in enumerate(self.presets):
+            self.index.setdefault(preset.type, []).append(i)
+
+    def __len__(self):
+        return len(self.presets) + len(self.favourites)
+
+    def categories(self):
+        """
+        Returns the available categories (in display order)
+        """
+        categories = [category for category in CATEGORIES if category in self.index]
+        categories += sorted(category for category in self.index if category not in CATEGORIES)
+        if self.favourites:
+            categories.insert(0, FAVOURITES_CATEGORY)
+        return categories
+
+    def filter(self, category=None, min_duration=None, max_duration=None):
+        """
+        Returns the presets matching the given category and estimated duration range (in seconds)
+        """
+        if category == FAVOURITES_CATEGORY:
+            return [
+                preset for preset in self.favourites
+                if (min_duration is None or preset.duration >= min_duration)
+                and (max_duration is None or preset.duration <= max_duration)
+            ]
+        # Narrow down to the duration range with binary search on the sorted durations
+        start = 0 if min_duration is None else bisect_left(self.durations, min_duration)
+        stop = len(self.presets) if max_duration is None else bisect_right(self.durations, max_duration)
+        if category is None:
+            return list(self.presets[start:stop])
+        indices = self.index.get(category, [])
+        first = bisect_left(indices, start)
+        last = bisect_left(indices, stop)
+        return [self.presets[i] for i in indices[first:last]]
+
+
+def _read_favourites(path):
+    """
+    Helper function for reading the user's favourites
+    The file is user data, so if it is broken the favourites are ignored instead of crashing the app
+    """
+    try:
+        return _read_presets(path, sources=[FAVOURITES_CATEGORY])
+    except (OSError, ValueError, TypeError, KeyError, AttributeError) as error:
+        Logger.warning("MCCApp: Ignoring invalid favourites file %s (%r)", path, error)
+        return []
+
+
+def _write_favourites(path, favourites):
+    """
+    Helper function for saving the user's favourites
+    """
+    content = {
+        'version': 2,
+        'presets': [
+            {
+                'type': preset.type,
+                'starting_time': preset.starting_time,
+                'increment': preset.increment,
+            }
+            for preset in favourites
+        ],
+    }
+    with open(path, 'w', encoding='utf-8') as file:
+        json.dump(content, file, indent=4)
+
+
+def is_favourite(path, starting_time, increment):
+    """
+    Returns whether the time control is among the user's favourites
+    """
+    favourites = _read_favourites(path) if os.path.exists(path) else []
+    return any(
+        (preset.starting_time, preset.increment) == (starting_time, increment)
+        for preset in favourites
+    )
+
+
+def toggle_favourite(path, starting_time, increment):
+    """
+    Add the time control to the user's favourites, or remove it if it is already there
+    Returns whether it is a favourite afterwards
+    """
+    favourites = _read_favourites(path) if os.path.exists(path) else []
+    remaining = [
+        preset for preset in favourites
+        if (preset.starting_time, preset.increment) != (starting_time, increment)
+    ]
+    added = len(remaining) == len(favourites)
+    if added:
+        remaining.append(TimeControlPreset(
+            type=classify_time_control(starting_time, increment),
+            starting_time=starting_time,
+            increment=increment,
+            sources=(FAVOURITES_CATEGORY,),
+            duration=estimate_game_duration(starting_time, increment),
+        ))
+    _write_favourites(path, remaining)
+    # The file may be rewritten within the resolution of its modification time
+    for cached_key in [cached_key for cached_key in _catalogs if cached_key[0] == path]:
+        del _catalogs[cached_key]
+    return added
+
+
+_presets = None
+_catalogs = {}
+
+
+def get_catalog(favourites_path=None):
+    """
+    Returns the time-control catalog, loading it from disk on first use
+    The bundled presets are read only once, the favourites whenever their file changes
+    """
+    global _presets # pylint: disable=W0603
+    if _presets is None:
+        _presets = _read_presets(PRESETS_PATH)
+    favourites_mtime = None
+    if favourites_path and os.path.exists(favourites_path):
+        favourites_mtime = os.path.getmtime(favourites_path)
+    key = (favourites_path, favourites_mtime)
+    if key not in _catalogs:
+        favourites = []
+        if favourites_mtime is not None:
+            favourites = _read_favourites(favourites_path)
+        # Only the latest version of each favourites file is kept
+        for cached_key in [cached_key for cached_key in _catalogs if cached_key[0] == favourites_path]:
+            del _catalogs[cached_key]
+        _catalogs[key] = TimeControlCatalog(_presets, favourites)
+    return _catalogs[key]
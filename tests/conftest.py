@@ -0,0 +1,19 @@
+"""
+Shared test setup: the app modules live in the repository root, and load their assets relative to it
+"""
+
+import os
+import sys
+
+import pytest
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT_DIR)
+
+
+@pytest.fixture(autouse=True)
+def root_dir(monkeypatch):
+    """
+    Run every test from the repository root
+    """
+    monkeypatch.chdir(ROOT_DIR)
@@ -0,0 +1,158 @@
+"""
+Tests for the helper functions
+"""
+
+from datetime import timedelta
+
+import pytest
+
+import helpers
+
+
+def test_convert_time_string_to_integer():
+    assert helpers.convert_time_string_to_integer("05:30") == 330
+
+
+def test_convert_timedelta_to_clock_time_string():
+    assert helpers.convert_timedelta_to_clock_time_string(timedelta(hours=1, minutes=2, seconds=3)) == "1:02:03"
+    assert helpers.convert_timedelta_to_clock_time_string(timedelta(minutes=5)) == "05:00"
+    assert helpers.convert_timedelta_to_clock_time_string(timedelta(seconds=9, milliseconds=500)) == "00:09.5"
+
+
+@pytest.mark.parametrize('window_size, orientation', [
+    ((1200, 600), 'landscape'),
+    ((600, 600), 'landscape'),
+    ((600, 1200), 'portrait'),
+])
+def test_get_window_orientation(window_size, orientation):
+    assert helpers.get_window_orientation(window_size) == orientation
+
+
+def test_compute_clock_button_size_landscape():
+    # Two buttons side by side, with the control layout (100 wide) between them
+    size = helpers.compute_clock_button_size((1200, 600), 'landscape', (100, 400), padding=15, spacing=15)
+
+    assert size == ((1200 - 30 - 30 - 100) / 2, 600 - 30)
+
+
+def test_compute_clock_button_size_portrait():
+    # Two buttons stacked, with the control layout (50 high) between them
+    size = helpers.compute_clock_button_size((600, 1200), 'portrait', (400, 50), padding=15, spacing=15)
+
+    assert size == (600 - 30, (1200 - 30 - 30 - 50) / 2)
+
+
+def test_compute_clock_button_sizes_fill_the_window():
+    window_size, control_size, padding, spacing = (1000, 500), (80, 300), 10, 20
+    width, height = helpers.compute_clock_button_size(window_size, 'landscape', control_size, padding, spacing)
+
+    assert 2*width + control_size[0] + 2*padding + 2*spacing == window_size[0]
+    assert height + 2*padding == window_size[1]
+
+
+def test_compute_fitted_font_size_limited_by_width():
+    # Text is 4 units wide and 1 unit high per font size unit, the button is wide but not wide enough
+    font_size = helpers.compute_fitted_font_size((400, 400), (4, 1), fill=0.5)
+
+    assert font_size == 50
+    assert font_size * 4 <= 400 * 0.5
+
+
+def test_compute_fitted_font_size_limited_by_height():
+    font_size = helpers.compute_fitted_font_size((4000, 100), (4, 1), fill=0.8)
+
+    assert font_size == pytest.approx(80)
+
+
+def test_compute_fitted_font_size_never_below_one():
+    assert helpers.compute_fitted_font_size((0, -10), (4, 1), fill=0.85) == 1
+
+
+class FakeTime:
+    """
+    Injected time source
+    """
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_get_monotonic_time_never_goes_back():
+    first = helpers.get_monotonic_time()
+
+    assert helpers.get_monotonic_time() >= first
+
+
+def test_consume_player_time_warns_once_when_reaching_the_threshold():
+    first = helpers.consume_player_time(timedelta(seconds=11), 2, is_warned=False)
+    second = helpers.consume_player_time(first.remaining, 1, first.is_warned)
+
+    assert first == (timedelta(seconds=9), True, 'warning', 2)
+    assert second == (timedelta(seconds=8), True, None, 1)
+
+
+def test_consume_player_time_resets_the_warning_above_the_threshold():
+    result = helpers.consume_player_time(timedelta(seconds=30), 1, is_warned=True)
+
+    assert result == (timedelta(seconds=29), False, None, 1)
+
+
+def test_consume_player_time_flags():
+    result = helpers.consume_player_time(timedelta(seconds=1), 1.5, is_warned=True)
+
+    assert result == (timedelta(0), True, 'flag', 1.5)
+
+
+def test_timer_charges_a_long_pause_exactly_once():
+    fake_time = FakeTime()
+    timer = helpers.ActivePlayerTimer(fake_time)
+    remaining, is_warned = timedelta(hours=3), False
+    timer.start()
+
+    fake_time.now += 1
+    remaining, is_warned, event, elapsed = timer.charge(remaining, is_warned)
+    assert (event, elapsed) == (None, 1)
+    # Two hours in the background: charged on resume, then the next tick only charges its own time
+    fake_time.now += 3600 * 2
+    remaining, is_warned, event, elapsed = timer.charge(remaining, is_warned)
+    assert (event, elapsed) == (None, 3600 * 2)
+    fake_time.now += 0.01
+    remaining, is_warned, event, elapsed = timer.charge(remaining, is_warned)
+
+    assert elapsed == pytest.approx(0.01)
+    assert abs(remaining - timedelta(seconds=3*3600 - 1 - 3600*2 - 0.01)) < timedelta(milliseconds=1)
+    assert timer.running
+
+
+def test_timer_flag_during_pause_stops_charging():
+    fake_time = FakeTime()
+    timer = helpers.ActivePlayerTimer(fake_time)
+    timer.start()
+    fake_time.now += 3600
+
+    result = timer.charge(timedelta(minutes=10), False)
+
+    assert result.remaining == timedelta(0)
+    assert result.event == 'flag'
+    assert not timer.running
+    # Nothing more is charged (or flagged again) after a flag
+    fake_time.now += 10
+    assert timer.charge(result.remaining, result.is_warned) == (timedelta(0), False, None, 0)
+
+
+def test_timer_does_not_charge_while_stopped():
+    fake_time = FakeTime()
+    timer = helpers.ActivePlayerTimer(fake_time)
+    timer.start()
+    fake_time.now += 5
+    timer.stop()
+    fake_time.now += 3600
+    timer.start()
+    fake_time.now += 2
+
+    result = timer.charge(timedelta(minutes=10), False)
+
+    assert result.elapsed == 2
+    assert result.remaining == timedelta(minutes=10, seconds=-2)
@@ -0,0 +1,192 @@
+"""
+Tests for the memory report helpers
+"""
+
+import gc
+from types import SimpleNamespace
+import tracemalloc
+
+import pytest
+
+import memory
+
+MB = 2**20
+
+def make_texture(width, height):
+    """
+    Fake texture of the given size
+    """
+    return SimpleNamespace(width=width, height=height)
+
+
+def make_canvas(*textures):
+    """
+    Fake canvas holding one instruction per texture
+    """
+    return SimpleNamespace(children=[SimpleNamespace(texture=texture) for texture in textures])
+
+
+def make_widget(label_texture=None, canvas_textures=(), children=()):
+    """
+    Fake widget (a label if it has a label texture)
+    """
+    widget = SimpleNamespace(
+        canvas=SimpleNamespace(before=make_canvas(*canvas_textures), after=make_canvas()),
+        children=list(children),
+    )
+    widget.canvas.children = []
+    if label_texture is not None:
+        widget.texture = label_texture
+        widget.font_size = 10
+        # Label textures are drawn by the label's own canvas too
+        widget.canvas.children = [SimpleNamespace(texture=label_texture)]
+    widget.walk = lambda restrict=True: [widget] + [
+        descendant for child in widget.children for descendant in child.walk()
+    ]
+    return widget
+
+
+@pytest.fixture
+def tracer():
+    """
+    Stop tracemalloc after the test if it was started by it
+    """
+    was_tracing = tracemalloc.is_tracing()
+    yield
+    if not was_tracing:
+        tracemalloc.stop()
+
+
+def test_report_breaks_down_subsystems(tracer):
+    tracker = memory.MemoryTracker(enabled=True)
+    with tracker.track('dialogs'):
+        dialog = bytearray(1024 * 1024)
+    report = tracker.report(textures={'dialogs': 400, 'fonts': 100}, native={'sounds': 2000})
+
+    assert report['dialogs']['python'] >= len(dialog)
+    assert report['dialogs']['textures'] == 400
+    assert report['fonts'] == {'python': 0, 'textures': 100, 'native': 0}
+    assert report['sounds'] == {'python': 0, 'textures': 0, 'native': 2000}
+    assert report['total']['textures'] == 500
+    assert report['total']['native'] == 2000
+    assert report['total']['python'] >= len(dialog)
+
+
+def test_report_forgets_released_subsystems(tracer):
+    tracker = memory.MemoryTracker(enabled=True)
+    with tracker.track('dialogs'):
+        _ = bytearray(1024)
+    tracker.release('dialogs')
+
+    assert 'dialogs' not in tracker.report()
+
+
+def test_disabled_tracker_reports_no_python_allocations():
+    tracker = memory.MemoryTracker(enabled=False)
+    with tracker.track('sounds'):
+        _ = bytearray(1024)
+
+    report = tracker.report(native={'sounds': 10})
+    assert report['sounds']['python'] == 0
+    assert report['total']['python'] == 0
+
+
+def test_widget_textures_separates_text_from_other_textures():
+    text = make_texture(10, 10)
+    shadow = make_texture(20, 20)
+    widget = make_widget(canvas_textures=[shadow], children=[make_widget(label_texture=text)])
+
+    assert list(memory.widget_textures(widget, text=True).values()) == [text]
+    assert list(memory.widget_textures(widget, text=False).values()) == [shadow]
+    assert len(memory.widget_textures(widget)) == 2
+
+
+def test_texture_bytes_counts_shared_textures_once():
+    shared = make_texture(10, 10)
+    other = make_texture(5, 5)
+    sizes = memory.texture_bytes({
+        'fonts': {id(shared): shared},
+        'clock_faces': {id(shared): shared, id(other): other},
+    })
+
+    assert sizes == {'fonts': 10 * 10 * 4, 'clock_faces': 5 * 5 * 4}
+
+
+def test_sound_bytes_uses_decoded_length_or_file_size():
+    decoded = memory.sound_bytes(SimpleNamespace(length=2.0))
+    assert decoded == 2 * memory.AUDIO_SAMPLE_RATE * memory.AUDIO_CHANNELS * memory.AUDIO_SAMPLE_WIDTH
+    assert memory.sound_bytes(SimpleNamespace(length=0), 'assets/warning-sound.mp3') > 0
+    assert memory.sound_bytes(SimpleNamespace(length=0), 'assets/missing.mp3') == 0
+
+
+@pytest.mark.skipif(memory.resource is None, reason="resource module not available")
+@pytest.mark.parametrize("platform, expected", [('darwin', 1000), ('linux', 1000 * 1024)])
+def test_peak_resident_set_size_units(monkeypatch, platform, expected):
+    monkeypatch.setattr(memory.sys, 'platform', platform)
+    monkeypatch.setattr(memory.resource, 'getrusage', lambda who: SimpleNamespace(ru_maxrss=1000))
+
+    assert memory.peak_resident_set_size() == expected
+
+
+class BigDialog:
+    """
+    Stand-in for a dialog widget tree: a large buffer kept in a reference cycle, like widget trees
+    """
+    def __init__(self, size, parent=None):
+        self.buffer = bytearray(size)
+        self.children = [self]
+        self.parent = parent
+
+
+class BigSound:
+    """
+    Stand-in for a loaded sound with a decoded audio buffer
+    """
+    def __init__(self, size):
+        self.buffer = bytearray(size)
+
+    def stop(self):
+        """
+        Stopping is a no-op
+        """
+
+    def unload(self):
+        """
+        Free the audio buffer
+        """
+        self.buffer = None
+
+
+def test_releasing_closed_dialogs_and_game_sounds_gets_under_budget(tracer):
+    tracker = memory.MemoryTracker(enabled=True)
+    baseline = tracemalloc.get_traced_memory()[0]
+    budget = baseline + 8 * MB
+    with tracker.track('dialogs'):
+        owner = SimpleNamespace(
+            reset_dialog=BigDialog(10 * MB),
+            quicksetup_dialog=BigDialog(10 * MB),
+            customsetup_dialog=None,
+        )
+    with tracker.track('sounds'):
+        sounds = {'warning_sound': BigSound(5 * MB), 'clock_button_click': BigSound(MB)}
+    assert tracker.report()['total']['python'] > budget
+
+    kept = memory.release_closed_dialogs(owner, ['reset_dialog', 'quicksetup_dialog', 'customsetup_dialog'])
+    memory.unload_sounds(sounds, ['warning_sound'])
+    gc.collect()
+
+    assert not kept
+    assert owner.reset_dialog is None and owner.quicksetup_dialog is None
+    assert list(sounds) == ['clock_button_click']
+    assert tracemalloc.get_traced_memory()[0] <= budget
+    resident = memory.resident_set_size()
+    if resident is not None:
+        assert resident <= memory.DEFAULT_MEMORY_BUDGET
+
+
+def test_open_dialogs_are_kept():
+    owner = SimpleNamespace(reset_dialog=BigDialog(1, parent=object()), quicksetup_dialog=BigDialog(1))
+
+    assert memory.release_closed_dialogs(owner, ['reset_dialog', 'quicksetup_dialog'])
+    assert owner.reset_dialog is not None
+    assert owner.quicksetup_dialog is None
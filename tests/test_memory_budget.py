@@ -0,0 +1,129 @@
+"""
+Tests for the lean mode memory budget of the app
+The mocked tests cover the release logic, the last one measures the real app (it needs Kivy and a window)
+"""
+
+from types import SimpleNamespace
+
+import pytest
+
+pytest.importorskip('kivymd')
+
+import main # pylint: disable=C0413
+import memory # pylint: disable=C0413
+
+MB = 2**20
+
+
+class FakeSound:
+    """
+    Stand-in for a loaded SoundLoader sound
+    """
+    length = 1.0
+
+    def __init__(self):
+        self.unloaded = False
+
+    def play(self):
+        """
+        Playing is a no-op
+        """
+
+    def stop(self):
+        """
+        Stopping is a no-op
+        """
+
+    def unload(self):
+        """
+        Record that the audio buffer was freed
+        """
+        self.unloaded = True
+
+
+@pytest.fixture
+def app(monkeypatch):
+    """
+    The app with fake sounds, a closed (dismissed) reset dialog, and a budget of 100 MB
+    """
+    app = main.app
+    monkeypatch.setattr(main, 'MEMORY_BUDGET', 100 * MB)
+    monkeypatch.setattr(app, 'running', False)
+    monkeypatch.setattr(app, 'reset_dialog', SimpleNamespace(parent=None))
+    monkeypatch.setattr(app, 'quicksetup_dialog', None)
+    monkeypatch.setattr(app, 'customsetup_dialog', None)
+    monkeypatch.setattr(app, 'sounds', {name: FakeSound() for name in main.SOUNDS})
+    return app
+
+
+def fake_resident_set_sizes(monkeypatch, *sizes):
+    """
+    Make the resident set size return the given values, one per call
+    """
+    values = iter(sizes)
+    monkeypatch.setattr(memory, 'resident_set_size', lambda: next(values))
+
+
+def test_over_budget_releases_memory_and_gets_under_budget(app, monkeypatch):
+    game_sounds = [app.sounds[name] for name in main.GAME_SOUNDS]
+    fake_resident_set_sizes(monkeypatch, 150 * MB, 80 * MB)
+
+    app.check_memory_budget()
+
+    assert app.reset_dialog is None
+    assert all(sound.unloaded for sound in game_sounds)
+    assert not any(name in app.sounds for name in main.GAME_SOUNDS)
+    # Button clicks are needed all the time, so they are kept
+    assert 'clock_button_click' in app.sounds
+
+
+def test_under_budget_keeps_everything(app, monkeypatch):
+    fake_resident_set_sizes(monkeypatch, 50 * MB)
+
+    app.check_memory_budget()
+
+    assert app.reset_dialog is not None
+    assert set(app.sounds) == set(main.SOUNDS)
+
+
+def test_unknown_resident_set_size_skips_the_check(app, monkeypatch):
+    fake_resident_set_sizes(monkeypatch, None)
+
+    assert app.check_memory_budget() is None
+    assert app.reset_dialog is not None
+
+
+def test_open_dialogs_and_running_game_sounds_are_kept(app, monkeypatch):
+    monkeypatch.setattr(app, 'running', True)
+    monkeypatch.setattr(app, 'reset_dialog', SimpleNamespace(parent=object()))
+    fake_resident_set_sizes(monkeypatch, 150 * MB, 120 * MB)
+
+    app.check_memory_budget()
+
+    assert app.reset_dialog is not None
+    assert set(main.GAME_SOUNDS) <= set(app.sounds)
+
+
+def test_resident_set_size_unknown_after_release(app, monkeypatch):
+    fake_resident_set_sizes(monkeypatch, 150 * MB, None)
+
+    assert app.check_memory_budget() is None
+    assert app.reset_dialog is None
+
+
+def test_built_app_stays_under_the_budget(monkeypatch):
+    if memory.resident_set_size() is None:
+        pytest.skip("resident set size not available")
+    app = main.app
+    monkeypatch.setattr(app, 'running', False)
+    app.root = app.build()
+    # Everything the lean mode tracks: all sounds and every dialog (built, but not open)
+    app.load_sounds(main.SOUNDS)
+    monkeypatch.setattr(app, 'reset_dialog', main.MCCResetDialog())
+    monkeypatch.setattr(app, 'quicksetup_dialog', main.MCCQuickSetupDialog())
+
+    app.release_memory()
+
+    assert app.reset_dialog is None and app.quicksetup_dialog is None
+    assert not set(main.GAME_SOUNDS) & set(app.sounds)
+    assert memory.resident_set_size() <= main.MEMORY_BUDGET
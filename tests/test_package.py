@@ -0,0 +1,69 @@
+"""
+Tests for the packaging helpers
+"""
+
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'tools'))
+
+import package # pylint: disable=C0413
+
+
+IMPORTTIME_OUTPUT = """\
+import time: self [us] | cumulative | imported package
+import time:       100 |        100 | site
+import time:        50 |         50 |     json.scanner
+import time:       200 |        250 |   json.decoder
+import time:       300 |        550 | json
+import time:        20 |         20 |   kivy.logger
+import time:        30 |         30 |     kivy.core.window
+import time:        40 |         70 |   kivy.core
+import time:      1000 |       1090 | kivy
+import time:        60 |         60 |       kivymd.uix.button
+import time:        10 |         70 |     kivymd.uix
+import time:        80 |        150 |   kivymd.app
+import time:         5 |          5 |   helpers
+import time:        25 |        180 | main
+"""
+
+
+def test_parse_import_times_counts_direct_imports_of_the_module():
+    times = package.parse_import_times(IMPORTTIME_OUTPUT, 'main')
+
+    assert times == {'kivymd': 150, 'main (self)': 25, 'helpers': 5}
+
+
+def test_import_times_of_a_stub_entry_point(tmp_path):
+    entry_point = tmp_path / 'main.py'
+    entry_point.write_text("import json\nimport email.parser\n", encoding='utf-8')
+
+    times = package.import_times(str(entry_point))
+
+    assert {'json', 'email', 'main (self)'} <= set(times)
+    assert 'site' not in times
+
+
+def test_unused_packages_keeps_packages_loaded_at_runtime(monkeypatch):
+    subpackages = {
+        'kivymd.uix.button': 'kivymd/uix/button',
+        'kivymd.uix.datatables': 'kivymd/uix/datatables',
+        'kivymd.uix.menu': 'kivymd/uix/menu',
+        'kivymd.tools': 'kivymd/tools',
+        'kivymd.tools.hotreload': 'kivymd/tools/hotreload',
+    }
+    monkeypatch.setattr(package, 'PRUNED_PACKAGES', ['kivymd'])
+    monkeypatch.setattr(package, 'find_subpackages', lambda name: subpackages)
+    # 'kivymd.uix.menu' is only reached through a Factory registration
+    closure = {'kivymd', 'kivymd.uix.button', 'kivymd.uix.menu.menu', 'kivymd.tools.hotreload'}
+
+    assert package.unused_packages(closure) == ['kivymd/tools', 'kivymd/uix/datatables']
+
+
+def test_runtime_modules_fails_loudly_without_the_app(monkeypatch):
+    monkeypatch.setattr(package, 'RUNTIME_MODULES_SCRIPT', "import sys; sys.exit(1)")
+
+    with pytest.raises(RuntimeError):
+        package.runtime_modules()
@@ -0,0 +1,133 @@
+"""
+Tests for pausing and resuming the app (eg when Android sends it to the background)
+"""
+
+from datetime import timedelta
+from types import SimpleNamespace
+
+import pytest
+
+pytest.importorskip('kivymd')
+
+import main # pylint: disable=C0413
+
+
+class FakeTime:
+    """
+    Injected monotonic time source
+    """
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+class FakeClock:
+    """
+    Stand-in for Kivy's Clock, recording the scheduled events
+    """
+    def __init__(self):
+        self.events = []
+
+    def schedule_interval(self, callback, timeout):
+        """
+        Record the scheduled event
+        """
+        event = SimpleNamespace(callback=callback, timeout=timeout)
+        self.events.append(event)
+        return event
+
+    def unschedule(self, event):
+        """
+        Drop the scheduled event
+        """
+        self.events.remove(event)
+
+
+@pytest.fixture
+def app(monkeypatch):
+    """
+    The app with fake player widgets, an injected time source and a fake Clock
+    """
+    app = main.app
+    fake_time = FakeTime()
+    fake_clock = FakeClock()
+    sides = {
+        color: {
+            'button': SimpleNamespace(disabled=color == 'black'),
+            'time_text': SimpleNamespace(time=timedelta(minutes=10), is_warned=False),
+        }
+        for color in ['white', 'black']
+    }
+    played = []
+    monkeypatch.setattr(main, 'Clock', fake_clock)
+    monkeypatch.setattr(main, 'LEAN_MODE', False)
+    monkeypatch.setattr(app, 'timer', main.helpers.ActivePlayerTimer(fake_time))
+    monkeypatch.setattr(app, 'get_white_side', lambda: sides['white'])
+    monkeypatch.setattr(app, 'get_black_side', lambda: sides['black'])
+    monkeypatch.setattr(app, 'update_control_buttons_disabled_state', lambda: None)
+    monkeypatch.setattr(app, 'play_sound', played.append)
+    monkeypatch.setattr(app, 'load_sounds', lambda names: None)
+    monkeypatch.setattr(app, 'running', False)
+    monkeypatch.setattr(app, 'flagged', False)
+    monkeypatch.setattr(app, 'refresh_event', None)
+    monkeypatch.setattr(app, 'memory_check_event', None)
+    app.active_player = 'white'
+    return SimpleNamespace(app=app, time=fake_time, clock=fake_clock, sides=sides, played=played)
+
+
+def tick(test, seconds):
+    """
+    Let the given time pass and run the refresh event (like a Clock tick would)
+    """
+    test.time.now += seconds
+    for event in list(test.clock.events):
+        event.callback(seconds)
+
+
+def test_long_pause_is_charged_exactly_once(app):
+    app.app.start_clock()
+    tick(app, 1)
+    assert app.app.on_pause() is True
+    assert not app.clock.events
+
+    app.time.now += 3600 * 2
+    app.app.on_resume()
+    # The first tick after resuming gets a huge 'dt' from Kivy, but it must not be charged again
+    app.time.now += 0.01
+    for event in list(app.clock.events):
+        event.callback(3600 * 2)
+
+    expected = timedelta(minutes=10) - timedelta(seconds=1 + 3600 * 2 + 0.01)
+    assert abs(app.sides['white']['time_text'].time - expected) < timedelta(milliseconds=1)
+    assert app.sides['black']['time_text'].time == timedelta(minutes=10)
+    assert app.app.running
+    assert len(app.clock.events) == 1
+
+
+def test_flag_during_pause_is_processed_on_resume(app):
+    app.app.start_clock()
+    tick(app, 1)
+    app.app.on_pause()
+
+    app.time.now += 3600
+    app.app.on_resume()
+
+    assert app.sides['white']['time_text'].time == timedelta(0)
+    assert app.app.flagged
+    assert not app.app.running
+    assert app.played == ['flagging_sound']
+    # Nothing is rescheduled after a flag
+    assert not app.clock.events
+    assert app.app.refresh_event is None
+
+
+def test_pause_without_running_game_changes_nothing(app):
+    app.app.on_pause()
+    app.time.now += 3600
+    app.app.on_resume()
+
+    assert app.sides['white']['time_text'].time == timedelta(minutes=10)
+    assert not app.clock.events
+    assert not app.app.flagged
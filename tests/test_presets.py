@@ -0,0 +1,131 @@
+"""
+Tests for the time-control preset catalog
+"""
+
+import json
+
+import pytest
+
+import presets
+
+
+def make_preset(starting_time, increment, sources=('FIDE',)):
+    """
+    Preset of the given time control (categorized like the bundled catalog)
+    """
+    return presets.TimeControlPreset(
+        type=presets.classify_time_control(starting_time, increment),
+        starting_time=starting_time,
+        increment=increment,
+        sources=tuple(sources),
+        duration=presets.estimate_game_duration(starting_time, increment),
+    )
+
+
+@pytest.fixture
+def catalog():
+    """
+    Catalog of a few presets (given out of order) and one favourite
+    """
+    return presets.TimeControlCatalog(
+        [
+            make_preset(90, 30),
+            make_preset(1, 0),
+            make_preset(15, 10),
+            make_preset(3, 2),
+            make_preset(5, 0),
+            make_preset(10, 0),
+            make_preset(60, 0),
+        ],
+        favourites=[make_preset(4, 2, sources=[presets.FAVOURITES_CATEGORY])],
+    )
+
+
+@pytest.fixture
+def no_cached_catalogs(monkeypatch):
+    """
+    Start every test without cached catalogs
+    """
+    monkeypatch.setattr(presets, '_catalogs', {})
+
+
+def time_controls(filtered):
+    """
+    The (starting_time, increment) pairs of the filtered presets
+    """
+    return [(preset.starting_time, preset.increment) for preset in filtered]
+
+
+def test_presets_are_sorted_by_duration(catalog):
+    assert list(catalog.durations) == sorted(catalog.durations)
+    assert len(catalog) == 8
+
+
+def test_categories_are_in_display_order_with_favourites_first(catalog):
+    assert catalog.categories() == [presets.FAVOURITES_CATEGORY, 'Bullet', 'Blitz', 'Rapid', 'Classical']
+
+
+def test_filter_by_category_uses_the_index(catalog):
+    assert time_controls(catalog.filter('Blitz')) == [(3, 2), (5, 0)]
+    assert time_controls(catalog.filter('Classical')) == [(60, 0), (90, 30)]
+    assert not catalog.filter('Armageddon')
+
+
+@pytest.mark.parametrize("min_duration, max_duration, expected", [
+    (None, None, [(1, 0), (3, 2), (5, 0), (10, 0), (15, 10), (60, 0), (90, 30)]),
+    (300, 600, [(5, 0), (10, 0)]),
+    (301, 599, []),
+    (None, 260, [(1, 0), (3, 2)]),
+    (1300, None, [(15, 10), (60, 0), (90, 30)]),
+])
+def test_filter_by_duration_bounds_are_inclusive(catalog, min_duration, max_duration, expected):
+    assert time_controls(catalog.filter(None, min_duration, max_duration)) == expected
+
+
+def test_filter_by_category_and_duration(catalog):
+    assert time_controls(catalog.filter('Rapid', 600, 1300)) == [(10, 0), (15, 10)]
+    assert time_controls(catalog.filter('Rapid', 601, None)) == [(15, 10)]
+    assert time_controls(catalog.filter('Blitz', None, 299)) == [(3, 2)]
+
+
+def test_filter_favourites(catalog):
+    assert time_controls(catalog.filter(presets.FAVOURITES_CATEGORY)) == [(4, 2)]
+    assert time_controls(catalog.filter(presets.FAVOURITES_CATEGORY, None, 320)) == [(4, 2)]
+    assert not catalog.filter(presets.FAVOURITES_CATEGORY, 321, None)
+
+
+def test_bundled_catalog_has_each_time_control_once(no_cached_catalogs):
+    catalog = presets.get_catalog()
+    controls = time_controls(catalog.presets)
+
+    assert len(controls) == len(set(controls))
+    for preset in catalog.presets:
+        assert preset.type == presets.classify_time_control(preset.starting_time, preset.increment)
+
+
+@pytest.mark.parametrize("content", [
+    "not json",
+    "[]",
+    json.dumps({'presets': [{'starting_time': 5, 'increment': 0}]}),
+    json.dumps({'presets': [None]}),
+])
+def test_invalid_favourites_are_ignored(tmp_path, no_cached_catalogs, content):
+    path = tmp_path / 'favourites.json'
+    path.write_text(content, encoding='utf-8')
+
+    catalog = presets.get_catalog(str(path))
+
+    assert not catalog.favourites
+    assert presets.FAVOURITES_CATEGORY not in catalog.categories()
+
+
+def test_toggle_favourite_writes_and_reloads(tmp_path, no_cached_catalogs):
+    path = str(tmp_path / 'favourites.json')
+
+    assert presets.toggle_favourite(path, 4, 2)
+    assert presets.is_favourite(path, 4, 2)
+    assert time_controls(presets.get_catalog(path).filter(presets.FAVOURITES_CATEGORY)) == [(4, 2)]
+
+    assert not presets.toggle_favourite(path, 4, 2)
+    assert not presets.is_favourite(path, 4, 2)
+    assert not presets.get_catalog(path).favourites
@@ -0,0 +1,151 @@
+"""
+Tests for the color scheme cache of the theme manager
+"""
+
+import pytest
+
+import themes
+
+PALETTES = {
+    ("Dark", "Green"): {'primaryColor': [0, 1, 0, 1], 'errorColor': [1, 0, 0, 1]},
+    ("Light", "Green"): {'primaryColor': [0, .5, 0, 1], 'errorColor': [.5, 0, 0, 1]},
+    ("Light", "Blue"): {'primaryColor': [0, 0, 1, 1], 'errorColor': [.5, 0, 0, 1]},
+}
+
+
+class FakeThemeManager:
+    """
+    Stand-in for KivyMD's ThemeManager: computes the scheme whenever the style or palette changes
+    """
+    def __init__(self):
+        self._theme_style = "Light"
+        self._primary_palette = "Green"
+        self.computed = 0
+        self.dispatched = []
+        self.color_writes = []
+        self.primaryColor = None # pylint: disable=C0103
+        self.errorColor = None # pylint: disable=C0103
+        # Like KivyMD, the constructor already computes the scheme
+        self.set_colors()
+
+    def __setattr__(self, name, value):
+        if name.endswith('Color') and getattr(self, name, None) != value and 'color_writes' in self.__dict__:
+            self.color_writes.append(name)
+        super().__setattr__(name, value)
+
+    @property
+    def theme_style(self):
+        """
+        Theme style, recomputing the scheme on change
+        """
+        return self._theme_style
+
+    @theme_style.setter
+    def theme_style(self, value):
+        self._theme_style = value
+        self.set_colors()
+
+    @property
+    def primary_palette(self):
+        """
+        Primary palette, recomputing the scheme on change
+        """
+        return self._primary_palette
+
+    @primary_palette.setter
+    def primary_palette(self, value):
+        self._primary_palette = value
+        self.set_colors()
+
+    def properties(self):
+        """
+        Names of the properties
+        """
+        return {'theme_style': None, 'primary_palette': None, 'primaryColor': None, 'errorColor': None}
+
+    def set_colors(self, *args):
+        """
+        The (expensive) scheme computation
+        """
+        self.computed += 1
+        for color_name, color in PALETTES[(self.theme_style, self.primary_palette)].items():
+            setattr(self, color_name, list(color))
+
+    def is_event_type(self, name):
+        """
+        Only 'on_colors' is registered
+        """
+        return name == "on_colors"
+
+    def dispatch(self, name):
+        """
+        Record dispatched events
+        """
+        self.dispatched.append(name)
+
+
+class CachingThemeManager(themes.SchemeCacheMixin, FakeThemeManager):
+    """
+    The mixin applied to the fake theme manager
+    """
+
+
+@pytest.fixture
+def manager():
+    """
+    A caching theme manager with its starting scheme cached
+    """
+    manager = CachingThemeManager()
+    manager.get_scheme()
+    return manager
+
+
+def test_base_constructor_may_fire_set_colors():
+    manager = CachingThemeManager()
+    assert manager.computed == 1
+
+
+def test_setting_style_and_palette_together_computes_once(manager):
+    computed = manager.computed
+    manager.set_theme("Light", "Blue")
+
+    assert manager.computed == computed + 1
+    assert manager.primaryColor == PALETTES[("Light", "Blue")]['primaryColor']
+
+
+def test_cached_scheme_is_applied_without_recomputing(manager):
+    manager.set_theme("Dark", "Green")
+    computed = manager.computed
+    manager.dispatched.clear()
+
+    manager.set_theme("Light", "Green")
+    manager.set_theme("Dark", "Green")
+
+    assert manager.computed == computed
+    assert manager.primaryColor == PALETTES[("Dark", "Green")]['primaryColor']
+    assert manager.errorColor == PALETTES[("Dark", "Green")]['errorColor']
+    assert manager.dispatched == ["on_colors", "on_colors"]
+
+
+def test_only_changed_colors_are_written(manager):
+    manager.set_theme("Light", "Blue")
+    manager.color_writes.clear()
+
+    # Same error color in both schemes
+    manager.set_theme("Light", "Green")
+
+    assert manager.color_writes == ['primaryColor']
+
+
+def test_same_theme_does_nothing(manager):
+    computed = manager.computed
+    manager.set_theme("Light", "Green")
+
+    assert manager.computed == computed
+    assert not manager.dispatched
+
+
+def test_get_scheme_returns_the_current_colors(manager):
+    manager.set_theme("Dark", "Green")
+
+    assert manager.get_scheme() == PALETTES[("Dark", "Green")]
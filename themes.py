@@ -0,0 +1,82 @@
+"""
+Contains the color scheme cache used by the app's theme manager
+"""
+
+
+class SchemeCacheMixin:
+    """
+    Mixin for KivyMD's ThemeManager that computes the color scheme of each theme only once
+    Switching to a theme that was used before applies the cached colors directly, and changing
+    the style and palette together (see 'set_theme') applies the new scheme only once
+    """
+    # Class-level defaults, as the base constructor may already fire 'set_colors'
+    scheme_cache = None
+    batching = False
+
+    def __init__(self, *args, **kwargs):
+        self.scheme_cache = {}
+        self.batching = False
+        super().__init__(*args, **kwargs)
+
+    def get_scheme_key(self):
+        """
+        Returns the cache key of the current color scheme
+        """
+        return (
+            self.theme_style,
+            self.primary_palette,
+            getattr(self, 'dynamic_scheme_name', None),
+            getattr(self, 'dynamic_scheme_contrast', None),
+        )
+
+    def get_color_names(self):
+        """
+        Returns the names of the color properties of the color scheme
+        """
+        return [name for name in self.properties() if name.endswith("Color")]
+
+    def get_scheme(self):
+        """
+        Returns the colors of the current scheme (from the cache, if possible)
+        """
+        if self.scheme_cache is None:
+            self.scheme_cache = {}
+        key = self.get_scheme_key()
+        if key not in self.scheme_cache:
+            self.scheme_cache[key] = {
+                color_name: list(getattr(self, color_name))
+                for color_name in self.get_color_names()
+            }
+        return self.scheme_cache[key]
+
+    def set_colors(self, *args):
+        """
+        Fired by KivyMD when the theme style or palette changes
+        """
+        if self.batching:
+            return
+        key = self.get_scheme_key()
+        if getattr(self, 'dynamic_color', False) or not self.scheme_cache or key not in self.scheme_cache:
+            # First use of this scheme, let KivyMD compute it
+            super().set_colors(*args)
+            self.get_scheme()
+            return
+        # Color properties only dispatch (and so update the widgets) if the value changed
+        for color_name, color in self.scheme_cache[key].items():
+            setattr(self, color_name, color)
+        if self.is_event_type("on_colors"):
+            self.dispatch("on_colors")
+
+    def set_theme(self, theme_style, primary_palette):
+        """
+        Set the theme style and palette together, applying the resulting scheme only once
+        """
+        if (theme_style, primary_palette) == (self.theme_style, self.primary_palette):
+            return
+        self.batching = True
+        try:
+            self.theme_style = theme_style
+            self.primary_palette = primary_palette
+        finally:
+            self.batching = False
+        self.set_colors()
@@ -0,0 +1,295 @@
+"""
+Packaging helpers for the Android build
+
+Usage (from the repository root, with the app's requirements installed):
+    python tools/package.py closure                  Print the modules the app needs (imported and loaded at runtime)
+    python tools/package.py blacklist                Regenerate tools/blacklist.txt (pruned Kivy/KivyMD packages)
+    python tools/package.py report [--apk PATH] [--baseline FILE] [--output FILE]
+                                                     Report APK size and import-time breakdown
+    python tools/package.py pin-kivymd COMMIT        Pin KivyMD to a commit in requirements.txt and buildozer.spec
+"""
+
+import argparse
+from collections import defaultdict
+import hashlib
+import json
+import modulefinder
+import os
+import re
+import subprocess
+import sys
+from urllib.request import urlopen
+import zipfile
+
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+ENTRY_POINT = os.path.join(ROOT_DIR, 'main.py')
+BLACKLIST_PATH = os.path.join(ROOT_DIR, 'tools', 'blacklist.txt')
+REQUIREMENTS_PATH = os.path.join(ROOT_DIR, 'requirements.txt')
+BUILDOZER_SPEC_PATH = os.path.join(ROOT_DIR, 'buildozer.spec')
+KIVYMD_ARCHIVE_URL = 'https://github.com/kivymd/KivyMD/archive/{commit}.zip'
+
+# Packages that are pruned down to the import closure of the app
+PRUNED_PACKAGES = ['kivy', 'kivymd']
+
+# Subpackages that are loaded dynamically (by name, or as data) and are never pruned
+KEEP_PACKAGES = [
+    'kivy.core', # Providers are selected at runtime
+    'kivy.lib',
+    'kivy.data',
+    'kivy.graphics',
+    'kivymd.fonts',
+    'kivymd.images',
+    'kivymd.data',
+]
+
+# Subpackages that are never needed by the app on the device
+ALWAYS_PRUNED = [
+    'kivy.tests',
+    'kivy.tools',
+    'kivymd.tests',
+    'kivymd.tools',
+]
+
+
+# Script run in a subprocess: starts the app for a few seconds, then prints the modules it loaded,
+# including the ones Kivy's Factory registered (KivyMD loads many classes through it and kv '#:import')
+RUNTIME_MODULES_SCRIPT = """
+import json
+import sys
+sys.path.insert(0, {root_dir!r})
+from kivy.clock import Clock
+from kivy.factory import Factory
+import main
+Clock.schedule_once(lambda dt: main.app.stop(), {run_time!r})
+main.app.run()
+modules = set(sys.modules)
+modules.update(entry['module'] for entry in Factory.classes.values() if entry.get('module'))
+print(json.dumps(sorted(modules)))
+"""
+RUN_TIME = 3 # in seconds
+
+
+def static_import_closure(entry_point=ENTRY_POINT):
+    """
+    Returns the set of module names reached from the entry point through import statements
+    """
+    finder = modulefinder.ModuleFinder(path=[ROOT_DIR] + sys.path)
+    finder.run_script(entry_point)
+    return set(finder.modules)
+
+
+def runtime_modules(run_time=RUN_TIME):
+    """
+    Returns the set of module names loaded by actually running the app (plus the Factory registered ones)
+    """
+    result = subprocess.run(
+        [sys.executable, '-c', RUNTIME_MODULES_SCRIPT.format(root_dir=ROOT_DIR, run_time=run_time)],
+        cwd=ROOT_DIR,
+        capture_output=True,
+        text=True,
+        check=False,
+    )
+    if result.returncode != 0 or not result.stdout.strip():
+        raise RuntimeError(f"Running the app failed, cannot compute its modules:\n{result.stderr}")
+    return set(json.loads(result.stdout.strip().splitlines()[-1]))
+
+
+def import_closure(entry_point=ENTRY_POINT):
+    """
+    Returns the set of module names the app needs: the static import closure, merged with the modules
+    loaded at runtime (modulefinder alone misses the ones loaded through Factory and kv files)
+    """
+    return static_import_closure(entry_point) | runtime_modules()
+
+
+def find_subpackages(package_name):
+    """
+    Returns the names and directories of the subpackages of an installed package
+    """
+    package = __import__(package_name)
+    package_dir = os.path.dirname(package.__file__)
+    subpackages = {}
+    for dirpath, dirnames, filenames in os.walk(package_dir):
+        dirnames[:] = [dirname for dirname in dirnames if dirname != '__pycache__']
+        if '__init__.py' in filenames and dirpath != package_dir:
+            relative_path = os.path.relpath(dirpath, os.path.dirname(package_dir))
+            subpackages[relative_path.replace(os.sep, '.')] = relative_path.replace(os.sep, '/')
+    return subpackages
+
+
+def unused_packages(closure):
+    """
+    Returns the directories of the Kivy/KivyMD subpackages that the app never imports
+    """
+    def is_kept(name):
+        return any(name == kept or name.startswith(kept + '.') for kept in KEEP_PACKAGES)
+
+    def is_always_pruned(name):
+        return any(name == pruned or name.startswith(pruned + '.') for pruned in ALWAYS_PRUNED)
+
+    def is_used(name):
+        return any(module == name or module.startswith(name + '.') for module in closure)
+
+    unused = []
+    for package_name in PRUNED_PACKAGES:
+        for name, path in sorted(find_subpackages(package_name).items()):
+            if is_always_pruned(name) or not (is_kept(name) or is_used(name)):
+                # Parent already pruned, no need for a separate pattern
+                if not any(path.startswith(parent + '/') for parent in unused):
+                    unused.append(path)
+    return unused
+
+
+def write_blacklist(unused, path=BLACKLIST_PATH):
+    """
+    Write the python-for-android blacklist file excluding the unused packages from the APK
+    """
+    with open(path, 'w', encoding='utf-8') as file:
+        file.write("# Generated by tools/package.py blacklist, do not edit by hand\n")
+        for package_path in unused:
+            file.write(f"*/{package_path}/*\n")
+
+
+def import_times(entry_point=ENTRY_POINT):
+    """
+    Returns the cumulative import time (in microseconds) of the packages imported by the app (see parse_import_times)
+    """
+    module_name = os.path.splitext(os.path.basename(entry_point))[0]
+    result = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', f"import {module_name}"],
+        cwd=os.path.dirname(entry_point),
+        capture_output=True,
+        text=True,
+        check=False,
+    )
+    if result.returncode != 0:
+        print(f"Warning: importing {module_name} failed, import times are incomplete", file=sys.stderr)
+    return parse_import_times(result.stderr, module_name)
+
+
+def parse_import_times(output, module_name):
+    """
+    Returns the cumulative import time (in microseconds) of the direct imports of a module,
+    grouped by top-level package, from the output of 'python -X importtime'
+    The module's own import time is reported as '<module_name> (self)'
+    """
+    times = defaultdict(int)
+    children = []
+    for line in output.splitlines():
+        # Format: 'import time: self [us] | cumulative | imported package'
+        # Nested imports are indented by two spaces per level and printed before their parent
+        if not line.startswith('import time:') or 'cumulative' in line:
+            continue
+        self_time, cumulative, name = line[len('import time:'):].split('|')
+        depth = (len(name) - len(name.lstrip()) - 1) // 2
+        if depth == 1:
+            children.append((name.strip(), int(cumulative)))
+        elif depth == 0:
+            if name.strip() == module_name:
+                for child_name, child_cumulative in children:
+                    times[child_name.split('.')[0]] += child_cumulative
+                times[f"{module_name} (self)"] += int(self_time)
+            children = []
+    return dict(sorted(times.items(), key=lambda item: item[1], reverse=True))
+
+
+def apk_sizes(apk_path):
+    """
+    Returns the total size of the APK and the compressed size of its top-level directories (in bytes)
+    """
+    sizes = defaultdict(int)
+    with zipfile.ZipFile(apk_path) as apk:
+        for info in apk.infolist():
+            sizes[info.filename.split('/')[0]] += info.compress_size
+    return {
+        'total': os.path.getsize(apk_path),
+        'entries': dict(sorted(sizes.items(), key=lambda item: item[1], reverse=True)),
+    }
+
+
+def print_report(report, baseline=None):
+    """
+    Print the packaging report (compared to the baseline report if given)
+    """
+    baseline = baseline or {}
+
+    def change(current, previous):
+        return f" ({current - previous:+,})" if previous is not None else ""
+
+    if 'apk' in report:
+        previous = baseline.get('apk', {}).get('total')
+        print(f"APK size: {report['apk']['total']:,} bytes{change(report['apk']['total'], previous)}")
+        for entry, size in report['apk']['entries'].items():
+            previous = baseline.get('apk', {}).get('entries', {}).get(entry)
+            print(f"    {entry:<30} {size:>12,}{change(size, previous)}")
+    total = sum(report['import_times'].values())
+    previous_total = sum(baseline['import_times'].values()) if 'import_times' in baseline else None
+    total_change = change(total // 1000, previous_total // 1000) if previous_total is not None else ""
+    print(f"Import time: {total // 1000:,} ms{total_change} (per package in us)")
+    for package, cumulative in report['import_times'].items():
+        previous = baseline.get('import_times', {}).get(package)
+        print(f"    {package:<30} {cumulative:>12,}{change(cumulative, previous)}")
+
+
+def pin_kivymd(commit):
+    """
+    Pin KivyMD to the given commit (with the hash of its archive) in requirements.txt and buildozer.spec
+    """
+    url = KIVYMD_ARCHIVE_URL.format(commit=commit)
+    with urlopen(url) as response:
+        sha256 = hashlib.sha256(response.read()).hexdigest()
+    with open(REQUIREMENTS_PATH, encoding='utf-8') as file:
+        requirements = file.read()
+    requirements = re.sub(r'^kivymd @ .*$', f"kivymd @ {url}#sha256={sha256}", requirements, flags=re.MULTILINE)
+    with open(REQUIREMENTS_PATH, 'w', encoding='utf-8') as file:
+        file.write(requirements)
+    with open(BUILDOZER_SPEC_PATH, encoding='utf-8') as file:
+        spec = file.read()
+    spec = re.sub(r'git\+https://github\.com/kivymd/KivyMD\.git@[^,\s]+', f"git+https://github.com/kivymd/KivyMD.git@{commit}", spec)
+    with open(BUILDOZER_SPEC_PATH, 'w', encoding='utf-8') as file:
+        file.write(spec)
+
+
+def main():
+    """
+    Command line entry point
+    """
+    parser = argparse.ArgumentParser(description="Packaging helpers for the Android build")
+    subparsers = parser.add_subparsers(dest='command', required=True)
+    subparsers.add_parser('closure', help="print the modules imported from main.py")
+    subparsers.add_parser('blacklist', help="regenerate the python-for-android blacklist")
+    report_parser = subparsers.add_parser('report', help="report APK size and import times")
+    report_parser.add_argument('--apk', help="path of the built APK")
+    report_parser.add_argument('--baseline', help="previous report to compare with")
+    report_parser.add_argument('--output', help="save the report (as JSON) to this path")
+    pin_parser = subparsers.add_parser('pin-kivymd', help="pin KivyMD to a commit")
+    pin_parser.add_argument('commit', help="KivyMD commit hash")
+    args = parser.parse_args()
+
+    if args.command == 'closure':
+        for module_name in sorted(import_closure()):
+            print(module_name)
+    elif args.command == 'blacklist':
+        unused = unused_packages(import_closure())
+        write_blacklist(unused)
+        print(f"Pruned {len(unused)} packages, written to {os.path.relpath(BLACKLIST_PATH)}")
+    elif args.command == 'report':
+        report = {'import_times': import_times()}
+        if args.apk:
+            report['apk'] = apk_sizes(args.apk)
+        baseline = None
+        if args.baseline:
+            with open(args.baseline, encoding='utf-8') as file:
+                baseline = json.load(file)
+        print_report(report, baseline)
+        if args.output:
+            with open(args.output, 'w', encoding='utf-8') as file:
+                json.dump(report, file, indent=4)
+    elif args.command == 'pin-kivymd':
+        pin_kivymd(args.commit)
+        print(f"Pinned KivyMD to {args.commit}")
+
+
+if __name__ == '__main__':
+    main()